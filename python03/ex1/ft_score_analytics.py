@@ -1,14 +1,490 @@
 #!/usr/bin/env python3
 """Score Cruncher - Analyze player scores from command line."""
 
+import argparse
+import heapq
+import math
+import os
+import random
 import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from itertools import islice
 
+# Scores folded into the running statistics at a time.
+STREAM_CHUNK = 1 << 16
 
-def main():
+
+# Default KLL accuracy parameter and number of top scores kept.
+SKETCH_K = 200
+TOP_K = 100
+
+
+class QuantileSketch:
+    """KLL quantile sketch: mergeable, O(k) memory for any stream length.
+
+    Level h keeps items of weight 2**h. When the sketch outgrows its
+    budget, the lowest full level is sorted and every other item
+    (random parity) is promoted to the next level, so each compaction
+    costs a bounded, unbiased rank error. Level capacities shrink
+    geometrically (factor 2/3) below the top level, so memory stays
+    around 3k items.
+
+    Error bound: a quantile query returns an item whose true rank is
+    within about 1.7 / k * n of the requested rank with probability
+    >= 99% (n the stream length), i.e. under 1% of n for the default
+    k = 200. check_sketch measures it against exact sorted results.
+    Merging two sketches gives the same guarantee on the union.
+    """
+
+    def __init__(self, k=SKETCH_K, seed=None):
+        self.k = k
+        self.levels = [[]]
+        self.count = 0
+        self._random = random.Random(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, math.ceil(self.k * (2 / 3) ** depth))
+
+    def _budget(self):
+        return sum(self._capacity(h) for h in range(len(self.levels)))
+
+    def update(self, values):
+        """Add an iterable of values."""
+        before = len(self.levels[0])
+        self.levels[0].extend(values)
+        self.count += len(self.levels[0]) - before
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Fold another sketch into this one and return self."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, items in zip(self.levels, other.levels):
+            level.extend(items)
+        self.count += other.count
+        self._compress()
+        return self
+
+    def _compress(self):
+        while sum(map(len, self.levels)) > self._budget():
+            for h, items in enumerate(self.levels):
+                if len(items) >= self._capacity(h):
+                    break
+            if h + 1 == len(self.levels):
+                self.levels.append([])
+            items.sort()
+            kept = [items.pop()] if len(items) % 2 else []
+            self.levels[h + 1].extend(
+                items[self._random.getrandbits(1)::2]
+            )
+            self.levels[h] = kept
+
+    def quantile(self, q):
+        """Return an approximate q-quantile (0 <= q <= 1)."""
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs):
+        """Return approximate quantiles for a list of fractions."""
+        if self.count == 0:
+            raise ValueError("Empty sketch")
+        weighted = sorted(
+            (item, 1 << h)
+            for h, items in enumerate(self.levels) for item in items
+        )
+        total = sum(weight for _, weight in weighted)
+        results = []
+        for q in qs:
+            target = q * total
+            seen = 0
+            for item, weight in weighted:
+                seen += weight
+                if seen >= target:
+                    break
+            results.append(item)
+        return results
+
+
+class TopK:
+    """The k largest values seen, kept in a bounded min-heap."""
+
+    def __init__(self, k=TOP_K):
+        if k < 1:
+            raise ValueError("k must be >= 1")
+        self.k = k
+        self.heap = []
+
+    def update(self, values):
+        """Add an iterable of values."""
+        heap = self.heap
+        k = self.k
+        for value in values:
+            if len(heap) < k:
+                heapq.heappush(heap, value)
+            elif value > heap[0]:
+                heapq.heapreplace(heap, value)
+        return self
+
+    def merge(self, other):
+        """Fold another TopK into this one and return self."""
+        return self.update(other.heap)
+
+    def values(self):
+        """Return the kept values, largest first."""
+        return sorted(self.heap, reverse=True)
+
+
+class ScoreStats:
+    """Single-pass, mergeable count/sum/min/max/mean/variance.
+
+    count, total, low and high are exact integers. The mean and the
+    sum of squared deviations (m2) follow Welford's method, each chunk
+    being folded in with Chan's pairwise update, so two ScoreStats
+    built on different shards merge into the stats of the union.
+    With sketch_k / top_k set, a QuantileSketch and a TopK are kept
+    and merged alongside; skipped counts invalid tokens passed over.
+    """
+
+    def __init__(self, sketch_k=None, top_k=None):
+        self.count = 0
+        self.total = 0
+        self.low = None
+        self.high = None
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.skipped = 0
+        self.sketch = None if sketch_k is None else QuantileSketch(sketch_k)
+        self.top = None if top_k is None else TopK(top_k)
+
+    def options(self):
+        """Return the (sketch_k, top_k) this instance was created with."""
+        return (
+            None if self.sketch is None else self.sketch.k,
+            None if self.top is None else self.top.k,
+        )
+
+    @classmethod
+    def from_scores(cls, scores, sketch_k=None, top_k=None):
+        """Build the stats of an in-memory list of scores."""
+        stats = cls(sketch_k, top_k)
+        if stats.sketch is not None:
+            stats.sketch.update(scores)
+        if stats.top is not None:
+            stats.top.update(scores)
+        if scores:
+            stats.count = len(scores)
+            stats.total = sum(scores)
+            stats.low = min(scores)
+            stats.high = max(scores)
+            stats.mean = stats.total / stats.count
+            stats.m2 = math.fsum((s - stats.mean) ** 2 for s in scores)
+        return stats
+
+    def update(self, scores, chunk=STREAM_CHUNK):
+        """Fold an iterable of scores in, holding one chunk at a time."""
+        scores = iter(scores)
+        while True:
+            block = list(islice(scores, chunk))
+            if not block:
+                return self
+            self.merge(ScoreStats.from_scores(block, *self.options()))
+
+    def merge(self, other):
+        """Fold another ScoreStats into this one and return self."""
+        self.skipped += other.skipped
+        if other.count == 0:
+            return self
+        if self.sketch is not None and other.sketch is not None:
+            self.sketch.merge(other.sketch)
+        if self.top is not None and other.top is not None:
+            self.top.merge(other.top)
+        if self.count == 0:
+            self.count = other.count
+            self.total = other.total
+            self.low = other.low
+            self.high = other.high
+            self.mean = other.mean
+            self.m2 = other.m2
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.total += other.total
+        self.low = min(self.low, other.low)
+        self.high = max(self.high, other.high)
+        return self
+
+    @property
+    def average(self):
+        """Exact average score (total / count)."""
+        return self.total / self.count
+
+    @property
+    def variance(self):
+        """Population variance of the scores."""
+        return self.m2 / self.count
+
+    @property
+    def score_range(self):
+        """Difference between the high and low scores."""
+        return self.high - self.low
+
+
+def merge_stats(left, right):
+    """Return left merged with right (associative reducer)."""
+    return left.merge(right)
+
+
+def parse_score_tokens(tokens, skip_invalid=True):
+    """Convert a list of bytes or str tokens to scores.
+
+    Returns (scores, invalid): scores is a list of the valid values in
+    order and invalid an array('q') of the positions of the tokens
+    that are not integers. With skip_invalid=False parsing stops at
+    the first invalid token, which is then the last entry of invalid.
+    """
+    try:
+        return list(map(int, tokens)), array("q")
+    except ValueError:
+        pass
+    scores = []
+    invalid = array("q")
+    for position, token in enumerate(tokens):
+        try:
+            scores.append(int(token))
+        except ValueError:
+            invalid.append(position)
+            if not skip_invalid:
+                break
+    return scores, invalid
+
+
+def parse_score_buffer(data, skip_invalid=True):
+    """Parse a bytes buffer of whitespace-separated scores in bulk.
+
+    See parse_score_tokens for the result; positions count tokens.
+    """
+    return parse_score_tokens(data.split(), skip_invalid)
+
+
+def _update_from_buffer(stats, data, skip_invalid):
+    """Fold the scores of a bytes buffer into stats."""
+    tokens = data.split()
+    scores, invalid = parse_score_tokens(tokens, skip_invalid)
+    if invalid and not skip_invalid:
+        raise ValueError(tokens[invalid[-1]].decode("utf-8", "replace"))
+    stats.skipped += len(invalid)
+    stats.update(scores)
+
+
+def _stats_of_stream(file, stats, limit=None, skip_invalid=False):
+    """Fold the scores read from a binary file into stats."""
+    remaining = limit
+    pending = b""
+    while remaining is None or remaining > 0:
+        size = 1 << 20 if remaining is None else min(1 << 20, remaining)
+        block = file.read(size)
+        if not block:
+            break
+        if remaining is not None:
+            remaining -= len(block)
+        block = pending + block
+        cut = max(block.rfind(b"\n"), block.rfind(b" ")) + 1
+        pending = block[cut:]
+        _update_from_buffer(stats, block[:cut], skip_invalid)
+    _update_from_buffer(stats, pending, skip_invalid)
+    return stats
+
+
+def file_ranges(path, parts, options=(None, None, False)):
+    """Split a file into up to parts (path, start, end, options) ranges.
+
+    Every boundary is moved forward to just after a newline, so no
+    score is cut in two.
+    """
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as file:
+        for i in range(1, parts):
+            file.seek(max(size * i // parts, bounds[-1]))
+            file.readline()
+            bounds.append(min(file.tell(), size))
+    bounds.append(size)
+    return [(path, start, end, options)
+            for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def stats_of_range(file_range):
+    """Compute the ScoreStats of one (path, start, end, options) range.
+
+    options is (sketch_k, top_k, skip_invalid).
+    """
+    path, start, end, (sketch_k, top_k, skip_invalid) = file_range
+    with open(path, "rb") as file:
+        file.seek(start)
+        return _stats_of_stream(file, ScoreStats(sketch_k, top_k),
+                                end - start, skip_invalid)
+
+
+def analyze_sources(sources, workers=1, sketch_k=None, top_k=None,
+                    skip_invalid=False):
+    """Return the merged ScoreStats of files and/or stdin ("-").
+
+    Files are split into newline-aligned byte ranges reduced in
+    parallel when workers > 1; stdin is always streamed in order.
+    Invalid tokens raise ValueError unless skip_invalid, in which case
+    they are counted in stats.skipped.
+    """
+    options = (sketch_k, top_k, skip_invalid)
+    stats = ScoreStats(sketch_k, top_k)
+    for source in sources:
+        if source == "-":
+            stats.merge(_stats_of_stream(
+                sys.stdin.buffer, ScoreStats(sketch_k, top_k),
+                skip_invalid=skip_invalid,
+            ))
+        elif workers > 1:
+            ranges = file_ranges(source, workers, options)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                stats.merge(reduce(merge_stats,
+                                   executor.map(stats_of_range, ranges),
+                                   ScoreStats(sketch_k, top_k)))
+        else:
+            stats.merge(stats_of_range(
+                (source, 0, os.path.getsize(source), options)
+            ))
+    return stats
+
+
+def print_stats(stats):
+    """Print the summary lines shared by every input mode."""
+    print(f"Total players: {stats.count}")
+    print(f"Total score: {stats.total}")
+    print(f"Average score: {stats.average}")
+    print(f"High score: {stats.high}")
+    print(f"Low score: {stats.low}")
+    print(f"Score range: {stats.score_range}")
+    if stats.sketch is not None:
+        p50, p95, p99 = stats.sketch.quantiles([0.5, 0.95, 0.99])
+        print(f"Percentiles (approx.): p50={p50} p95={p95} p99={p99}")
+    if stats.top is not None:
+        print(f"Top {stats.top.k} scores: {stats.top.values()}")
+
+
+def check_sketch(count=10 ** 5, shards=4, seed=42):
+    """Compare sketch quantiles and top-k with exact sorted results.
+
+    The stream is split into shards whose ScoreStats are merged, as in
+    parallel mode. Returns the worst normalized rank error seen;
+    raises ValueError if the top-k or the error bound is wrong.
+    """
+    rng = random.Random(seed)
+    scores = [int(rng.lognormvariate(7, 1)) for _ in range(count)]
+    size = -(-count // shards)
+    stats = reduce(merge_stats, (
+        ScoreStats(SKETCH_K, TOP_K).update(scores[i:i + size])
+        for i in range(0, count, size)
+    ))
+    exact = sorted(scores)
+    if stats.top.values() != exact[::-1][:TOP_K]:
+        raise ValueError("Top-k differs from the exact top scores")
+
+    worst = 0.0
+    qs = [i / 100 for i in range(1, 100)]
+    for q, value in zip(qs, stats.sketch.quantiles(qs)):
+        # Any rank holding an equal value is a correct answer.
+        low = bisect_left(exact, value) / count
+        high = bisect_right(exact, value) / count
+        error = max(0.0, low - q, q - high)
+        worst = max(worst, error)
+    if worst > 2 * 1.7 / SKETCH_K:
+        raise ValueError(f"Rank error {worst:.4f} exceeds the bound")
+    return worst
+
+
+def parse_args(argv):
+    """Parse the command line of the score cruncher."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("scores", nargs="*", help="scores to analyze")
+    parser.add_argument(
+        "--file", action="append", default=[], metavar="PATH",
+        help="stream whitespace-separated scores from PATH ('-' for "
+             "stdin); may be repeated",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="processes reducing file chunks in parallel (default: 1)",
+    )
+    parser.add_argument(
+        "--skip-invalid", action="store_true",
+        help="skip invalid scores instead of aborting on the first one",
+    )
+    parser.add_argument(
+        "--percentiles", action="store_true",
+        help="also report approximate p50/p95/p99 (KLL sketch)",
+    )
+    parser.add_argument(
+        "--top", type=int, metavar="N",
+        help="also report the N highest scores",
+    )
+    parser.add_argument(
+        "--check-sketch", action="store_true",
+        help="compare the sketches against exact sorted results",
+    )
+    if argv is None:
+        argv = sys.argv[1:]
+    if not any(arg.startswith("--") for arg in argv):
+        # Plain "<score1> <score2> ..." command line: every token,
+        # "-abc" included, goes to the invalid-score report.
+        args = parser.parse_args([])
+        args.scores = list(argv)
+        return args
+    args = parser.parse_args(argv)
+    if args.top is not None and args.top < 1:
+        parser.error("--top must be >= 1")
+    return args
+
+
+def main(argv=None):
     """Process player scores and display analytics."""
+    args = parse_args(argv)
+    if args.check_sketch:
+        worst = check_sketch()
+        print(f"Sketch matches exact results (worst rank error {worst:.4%})")
+        return
+    options = (SKETCH_K if args.percentiles else None, args.top)
+
     print("=== Player Score Analytics ===")
 
-    arguments = sys.argv[1:]
+    if args.file:
+        try:
+            stats = analyze_sources(args.file, args.workers, *options,
+                                    skip_invalid=args.skip_invalid)
+        except ValueError as exc:
+            print(f"Invalid score detected: {exc}")
+            print("All scores must be integers.")
+            return
+        except OSError as exc:
+            print(f"Cannot read scores: {exc}")
+            return
+        if stats.count == 0:
+            print("No scores found in the given input.")
+            return
+        print(f"Scores processed: {stats.count} (streamed)")
+        if stats.skipped:
+            print(f"Invalid scores skipped: {stats.skipped}")
+        print_stats(stats)
+        print(f"Variance: {stats.variance}")
+        print(f"Standard deviation: {math.sqrt(stats.variance)}")
+        return
+
+    arguments = args.scores
 
     if len(arguments) == 0:
         print(
@@ -17,31 +493,20 @@ def main():
         )
         return
 
-    scores = []
-
-    for value in arguments:
-        try:
-            score = int(value)
-            scores.append(score)
-        except ValueError:
-            print(f"Invalid score detected: {value}")
-            print("All scores must be integers.")
-            return
-
-    total_players = len(scores)
-    total_score = sum(scores)
-    average_score = total_score / total_players
-    high_score = max(scores)
-    low_score = min(scores)
-    score_range = high_score - low_score
+    scores, invalid = parse_score_tokens(arguments, args.skip_invalid)
+    if invalid and not args.skip_invalid:
+        print(f"Invalid score detected: {arguments[invalid[-1]]}")
+        print("All scores must be integers.")
+        return
+    if not scores:
+        print("No valid scores provided.")
+        return
 
     print(f"Scores processed: {scores}")
-    print(f"Total players: {total_players}")
-    print(f"Total score: {total_score}")
-    print(f"Average score: {average_score}")
-    print(f"High score: {high_score}")
-    print(f"Low score: {low_score}")
-    print(f"Score range: {score_range}")
+    if invalid:
+        skipped = [arguments[i] for i in invalid]
+        print(f"Invalid scores skipped: {skipped}")
+    print_stats(ScoreStats.from_scores(scores, *options))
 
 
 if __name__ == "__main__":
@@ -1,7 +1,29 @@
 #!/usr/bin/env python3
 """Position Tracker - 3D coordinates using tuples (Z = height)."""
 
+import json
 import math
+import mmap
+import os
+import random
+import sys
+import time
+from array import array
+from itertools import compress, repeat
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Bytes of scratch memory one pairwise distance chunk may use.
+PAIRWISE_CHUNK_BYTES = 64 * 1024 * 1024
+
+# Bytes read per chunk by parse_coordinate_file.
+PARSE_CHUNK_BYTES = 1 << 22
+
+# Everything a well-formed "x,y,z" line may contain besides the commas.
+_NUMBER_BYTES = b"0123456789+- \t\r"
 
 
 def create_position(x, y, z):
@@ -16,6 +38,68 @@ def distance_3d(p1, p2):
     return math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2 + (z2 - z1) ** 2)
 
 
+def as_position_array(positions):
+    """Return positions as an N x 3 float64 NumPy array (NumPy only)."""
+    points = np.asarray(positions, dtype=np.float64)
+    return points.reshape(-1, 3)
+
+
+def distances_from(origin, positions):
+    """Return the distance from origin to each of positions.
+
+    positions is a sequence of (x, y, z) tuples or an N x 3 array. The
+    result is a NumPy float64 array when NumPy is installed, an
+    array('d') computed with math.dist otherwise.
+    """
+    if np is not None:
+        points = as_position_array(positions)
+        delta = points - np.asarray(origin, dtype=np.float64)
+        return np.sqrt(np.einsum("ij,ij->i", delta, delta))
+    return array("d", map(math.dist, repeat(tuple(origin)), positions))
+
+
+def pairwise_distance_chunks(positions, chunk_bytes=PAIRWISE_CHUNK_BYTES):
+    """Yield (first_row, rows) blocks of the all-pairs distance matrix.
+
+    Rows are produced a chunk at a time so that at most about
+    chunk_bytes of scratch memory is in use, whatever N is; rows is a
+    2-D NumPy array, or a list of array('d') rows without NumPy.
+    """
+    if np is not None:
+        points = as_position_array(positions)
+        count = len(points)
+        # One row needs an N x 3 difference block plus the N results.
+        step = max(1, chunk_bytes // (max(count, 1) * 4 * 8))
+        for first in range(0, count, step):
+            delta = points[first:first + step, None, :] - points[None, :, :]
+            yield first, np.sqrt(np.einsum("ijk,ijk->ij", delta, delta))
+        return
+
+    points = [tuple(p) for p in positions]
+    count = len(points)
+    step = max(1, chunk_bytes // (max(count, 1) * 8))
+    for first in range(0, count, step):
+        yield first, [
+            array("d", map(math.dist, repeat(origin), points))
+            for origin in points[first:first + step]
+        ]
+
+
+def pairwise_distances(positions, chunk_bytes=PAIRWISE_CHUNK_BYTES):
+    """Return the full N x N distance matrix (NumPy array or row list).
+
+    The result itself takes N * N * 8 bytes; iterate
+    pairwise_distance_chunks instead when that does not fit.
+    """
+    chunks = [rows for _, rows in
+              pairwise_distance_chunks(positions, chunk_bytes)]
+    if np is not None:
+        if not chunks:
+            return np.zeros((0, 0))
+        return np.concatenate(chunks)
+    return [row for rows in chunks for row in rows]
+
+
 def parse_coordinates(text):
     """Parse a 'x,y,z' string into a 3D position tuple of ints."""
     parts = text.split(",")
@@ -27,6 +111,171 @@ def parse_coordinates(text):
     return (x, y, z)
 
 
+def _parse_chunk(chunk, first_line, coords, errors):
+    """Parse complete newline-terminated lines into coords.
+
+    Returns the number of lines consumed. The fast path checks with
+    C-level bytes operations that every line is exactly number,number,
+    number, then lets json convert the integers. When a large chunk
+    fails, the badly shaped lines are located the same way and the
+    good runs between them re-parsed in bulk; small pieces are parsed
+    line by line so bad rows are reported as (line number, text).
+    """
+    lines = chunk.count(b"\n")
+    shape = chunk.translate(None, _NUMBER_BYTES)
+    if shape == b",,\n" * lines:
+        # Well-shaped lines form a JSON array once newlines become
+        # commas; json parses every integer in C in one call.
+        try:
+            values = json.loads(
+                b"[" + chunk[:-1].replace(b"\n", b",") + b"]"
+            )
+            coords.extend(array("i", values))
+            return lines
+        except (ValueError, OverflowError, TypeError):
+            pass
+
+    if lines > 64:
+        rows = chunk.split(b"\n")[:lines]
+        bad = list(compress(
+            range(lines), map(b",,".__ne__, shape.split(b"\n"))
+        ))
+        if not bad:
+            # Well shaped but some number is not a valid int32.
+            bad = [lines // 2]
+        done = 0
+        for index in bad + [lines]:
+            if index > done:
+                good = b"\n".join(rows[done:index]) + b"\n"
+                _parse_chunk(good, first_line + done, coords, errors)
+            if index < lines:
+                _parse_chunk(rows[index] + b"\n", first_line + index,
+                             coords, errors)
+            done = index + 1
+        return lines
+
+    for number, line in enumerate(chunk.split(b"\n")[:lines], first_line):
+        if not line.strip():
+            continue
+        parts = line.split(b",")
+        try:
+            if len(parts) != 3:
+                raise ValueError
+            row = array("i", map(int, parts))
+        except (ValueError, OverflowError):
+            errors.append((number, line.decode("utf-8", "replace")))
+            continue
+        coords.extend(row)
+    return lines
+
+
+def _chunks(data, chunk_bytes):
+    """Yield newline-terminated slices of a bytes-like object."""
+    start = 0
+    size = len(data)
+    while start < size:
+        end = min(start + chunk_bytes, size)
+        if end < size:
+            cut = data.rfind(b"\n", start, end)
+            end = cut + 1 if cut >= start else data.find(b"\n", end) + 1
+            if end == 0:
+                end = size
+        chunk = bytes(data[start:end])
+        if not chunk.endswith(b"\n"):
+            chunk += b"\n"
+        yield chunk
+        start = end
+
+
+def _stream_chunks(file, chunk_bytes):
+    """Yield newline-terminated chunks read from a binary file."""
+    pending = b""
+    while True:
+        block = file.read(chunk_bytes)
+        if not block:
+            break
+        block = pending + block
+        cut = block.rfind(b"\n") + 1
+        pending = block[cut:]
+        if cut:
+            yield block[:cut]
+    if pending:
+        yield pending + b"\n"
+
+
+def parse_coordinate_file(source, chunk_bytes=PARSE_CHUNK_BYTES,
+                          use_mmap=False):
+    """Parse many "x,y,z" lines at once, collecting bad rows.
+
+    source is a path, a binary file object or a bytes-like buffer; a
+    path can be memory-mapped with use_mmap. Returns (coords, errors):
+    coords is an N x 3 int32 NumPy array when NumPy is installed, a
+    flat array('i') of x, y, z triples otherwise, and errors lists the
+    (line number, text) of every row that could not be parsed. Blank
+    lines are skipped.
+    """
+    coords = array("i")
+    errors = []
+    line = 1
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            if use_mmap and os.fstat(file.fileno()).st_size:
+                with mmap.mmap(file.fileno(), 0,
+                               access=mmap.ACCESS_READ) as data:
+                    for chunk in _chunks(data, chunk_bytes):
+                        line += _parse_chunk(chunk, line, coords, errors)
+            else:
+                for chunk in _stream_chunks(file, chunk_bytes):
+                    line += _parse_chunk(chunk, line, coords, errors)
+    elif hasattr(source, "read"):
+        for chunk in _stream_chunks(source, chunk_bytes):
+            line += _parse_chunk(chunk, line, coords, errors)
+    else:
+        if not isinstance(source, (bytes, bytearray)):
+            source = bytes(source)
+        for chunk in _chunks(source, chunk_bytes):
+            line += _parse_chunk(chunk, line, coords, errors)
+
+    if np is not None:
+        return np.frombuffer(coords, dtype=np.int32).reshape(-1, 3), errors
+    return coords, errors
+
+
+def benchmark_parsing(lines=10 ** 6, bad_every=10 ** 4, seed=42):
+    """Compare looping parse_coordinates with parse_coordinate_file."""
+    print("=== Coordinate Parsing Benchmark ===")
+    rng = random.Random(seed)
+    rows = []
+    for i in range(lines):
+        if bad_every and i % bad_every == bad_every - 1:
+            rows.append("abc,def,ghi")
+        else:
+            rows.append(
+                f"{rng.randint(-10 ** 6, 10 ** 6)},"
+                f"{rng.randint(-10 ** 6, 10 ** 6)},{rng.randint(0, 500)}"
+            )
+    data = ("\n".join(rows) + "\n").encode()
+    print(f"{lines} lines, {len(data) / 2 ** 20:.1f} MiB")
+
+    start = time.perf_counter()
+    positions = []
+    for row in data.decode().splitlines():
+        try:
+            positions.append(parse_coordinates(row))
+        except ValueError:
+            pass
+    loop_time = time.perf_counter() - start
+    print(f"parse_coordinates loop: {lines / loop_time:,.0f} lines/s")
+
+    start = time.perf_counter()
+    coords, errors = parse_coordinate_file(data)
+    bulk_time = time.perf_counter() - start
+    print(
+        f"parse_coordinate_file: {lines / bulk_time:,.0f} lines/s "
+        f"(x{loop_time / bulk_time:.1f}, {len(errors)} bad rows)"
+    )
+
+
 def main():
     """Demonstrate tuple-based 3D coordinate processing."""
     print("=== Game Coordinate System ===")
@@ -69,4 +318,7 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:] == ["--bench-parse"]:
+        benchmark_parsing()
+    else:
+        main()
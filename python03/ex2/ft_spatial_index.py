@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""Spatial Index - radius and nearest-neighbour queries on (x, y, z)."""
+
+import heapq
+import math
+import random
+import sys
+import time
+from itertools import product
+
+from ft_coordinate_system import create_position, distance_3d
+
+# Points per KD-tree leaf, scanned linearly.
+KD_LEAF_SIZE = 16
+
+
+class GridIndex:
+    """Uniform grid hash over moving keyed positions.
+
+    Space is cut into cubes of cell_size; each occupied cube maps to
+    the keys inside it, so insert/move/remove are O(1) and a radius
+    query only visits the cubes overlapping the query sphere. Choose
+    cell_size close to the typical query radius.
+    """
+
+    def __init__(self, cell_size):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = cell_size
+        self.cells = {}
+        self.positions = {}
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _cell(self, position):
+        size = self.cell_size
+        return tuple(math.floor(c / size) for c in position)
+
+    def insert(self, key, position):
+        """Add key at position (an (x, y, z) tuple)."""
+        if key in self.positions:
+            raise KeyError(f"{key!r} is already indexed")
+        position = tuple(position)
+        self.positions[key] = position
+        self.cells.setdefault(self._cell(position), {})[key] = position
+
+    def remove(self, key):
+        """Remove key from the index."""
+        position = self.positions.pop(key)
+        cell = self._cell(position)
+        members = self.cells[cell]
+        del members[key]
+        if not members:
+            del self.cells[cell]
+
+    def move(self, key, position):
+        """Move key to a new position."""
+        position = tuple(position)
+        old_cell = self._cell(self.positions[key])
+        new_cell = self._cell(position)
+        self.positions[key] = position
+        if old_cell == new_cell:
+            self.cells[new_cell][key] = position
+            return
+        members = self.cells[old_cell]
+        del members[key]
+        if not members:
+            del self.cells[old_cell]
+        self.cells.setdefault(new_cell, {})[key] = position
+
+    def radius(self, center, radius):
+        """Return (distance, key) pairs within radius, nearest first."""
+        low = self._cell(c - radius for c in center)
+        high = self._cell(c + radius for c in center)
+        spans = [range(lo, hi + 1) for lo, hi in zip(low, high)]
+        volume = math.prod(len(span) for span in spans)
+        if volume > len(self.cells):
+            cells = (
+                members for cell, members in self.cells.items()
+                if all(lo <= c <= hi for c, lo, hi in zip(cell, low, high))
+            )
+        else:
+            cells = filter(None, map(self.cells.get, product(*spans)))
+
+        found = []
+        for members in cells:
+            for key, position in members.items():
+                distance = math.dist(center, position)
+                if distance <= radius:
+                    found.append((distance, key))
+        found.sort()
+        return found
+
+    def nearest(self, center, k=1):
+        """Return the k nearest (distance, key) pairs, nearest first.
+
+        Cells are visited in growing shells around the center cell; the
+        search stops once the k-th best distance cannot be beaten by
+        any point of the next shell.
+        """
+        k = min(k, len(self.positions))
+        if k <= 0:
+            return []
+        origin = self._cell(center)
+        best = []
+        seen = 0
+        ring = 0
+        while True:
+            for members in self._shell(origin, ring):
+                seen += len(members)
+                for key, position in members.items():
+                    entry = (-math.dist(center, position), key)
+                    if len(best) < k:
+                        heapq.heappush(best, entry)
+                    elif entry > best[0]:
+                        heapq.heapreplace(best, entry)
+            if seen == len(self.positions):
+                break
+            if len(best) == k and -best[0][0] <= ring * self.cell_size:
+                break
+            ring += 1
+        return sorted((-distance, key) for distance, key in best)
+
+    def _shell(self, origin, ring):
+        """Yield the occupied cells at Chebyshev distance ring."""
+        if (2 * ring + 1) ** 3 > len(self.cells):
+            for cell, members in self.cells.items():
+                if max(abs(c - o) for c, o in zip(cell, origin)) == ring:
+                    yield members
+            return
+        span = range(-ring, ring + 1)
+        for offset in product(span, repeat=3):
+            if max(map(abs, offset)) != ring:
+                continue
+            members = self.cells.get(
+                tuple(o + d for o, d in zip(origin, offset))
+            )
+            if members:
+                yield members
+
+
+class KDTree:
+    """Static 3-D KD-tree over keyed positions.
+
+    The tree is implicit: points are reordered in place so that every
+    range [lo, hi) is split at its median on axis depth % 3, and ranges
+    of at most KD_LEAF_SIZE points are scanned linearly.
+    """
+
+    def __init__(self, items):
+        """Build from an iterable of (key, (x, y, z)) pairs."""
+        entries = [(tuple(position), key) for key, position in items]
+        self._build(entries, 0, len(entries), 0)
+        self.points = [position for position, _ in entries]
+        self.keys = [key for _, key in entries]
+
+    def __len__(self):
+        return len(self.points)
+
+    @classmethod
+    def _build(cls, entries, lo, hi, depth):
+        if hi - lo <= KD_LEAF_SIZE:
+            return
+        axis = depth % 3
+        entries[lo:hi] = sorted(entries[lo:hi], key=lambda e: e[0][axis])
+        mid = (lo + hi) // 2
+        cls._build(entries, lo, mid, depth + 1)
+        cls._build(entries, mid + 1, hi, depth + 1)
+
+    def radius(self, center, radius):
+        """Return (distance, key) pairs within radius, nearest first."""
+        found = []
+        points = self.points
+        stack = [(0, len(points), 0)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            if hi - lo <= KD_LEAF_SIZE:
+                for i in range(lo, hi):
+                    distance = math.dist(center, points[i])
+                    if distance <= radius:
+                        found.append((distance, self.keys[i]))
+                continue
+            mid = (lo + hi) // 2
+            distance = math.dist(center, points[mid])
+            if distance <= radius:
+                found.append((distance, self.keys[mid]))
+            axis = depth % 3
+            delta = center[axis] - points[mid][axis]
+            if delta <= radius:
+                stack.append((lo, mid, depth + 1))
+            if delta >= -radius:
+                stack.append((mid + 1, hi, depth + 1))
+        found.sort()
+        return found
+
+    def nearest(self, center, k=1):
+        """Return the k nearest (distance, key) pairs, nearest first."""
+        k = min(k, len(self.points))
+        if k <= 0:
+            return []
+        best = []
+        self._nearest(center, k, best, 0, len(self.points), 0)
+        return sorted((-distance, self.keys[i]) for distance, i in best)
+
+    def _nearest(self, center, k, best, lo, hi, depth):
+        points = self.points
+        if hi - lo <= KD_LEAF_SIZE:
+            for i in range(lo, hi):
+                _offer(best, k, -math.dist(center, points[i]), i)
+            return
+        mid = (lo + hi) // 2
+        _offer(best, k, -math.dist(center, points[mid]), mid)
+        axis = depth % 3
+        delta = center[axis] - points[mid][axis]
+        if delta < 0:
+            near, far = (lo, mid), (mid + 1, hi)
+        else:
+            near, far = (mid + 1, hi), (lo, mid)
+        self._nearest(center, k, best, *near, depth + 1)
+        if len(best) < k or abs(delta) < -best[0][0]:
+            self._nearest(center, k, best, *far, depth + 1)
+
+
+def _offer(best, k, negative_distance, index):
+    """Keep the k closest candidates in a max-heap of -distance."""
+    entry = (negative_distance, index)
+    if len(best) < k:
+        heapq.heappush(best, entry)
+    elif entry > best[0]:
+        heapq.heapreplace(best, entry)
+
+
+def brute_force_radius(positions, center, radius):
+    """Return (distance, key) pairs within radius by scanning every key."""
+    found = []
+    for key, position in positions.items():
+        distance = distance_3d(center, position)
+        if distance <= radius:
+            found.append((distance, key))
+    found.sort()
+    return found
+
+
+def brute_force_nearest(positions, center, k=1):
+    """Return the k nearest (distance, key) pairs by scanning every key."""
+    return heapq.nsmallest(
+        k,
+        ((distance_3d(center, position), key)
+         for key, position in positions.items()),
+    )
+
+
+def benchmark(sizes=(10 ** 4, 10 ** 5, 10 ** 6), queries=20, extent=10000,
+              radius=50, k=10, seed=42):
+    """Time radius and k-nearest queries against a distance_3d scan."""
+    print("=== Spatial Index Benchmark ===")
+    rng = random.Random(seed)
+    for size in sizes:
+        positions = {
+            i: create_position(rng.uniform(0, extent),
+                               rng.uniform(0, extent),
+                               rng.uniform(0, extent / 10))
+            for i in range(size)
+        }
+        centers = [positions[rng.randrange(size)] for _ in range(queries)]
+        print(f"--- {size} points, {queries} queries each ---")
+
+        start = time.perf_counter()
+        grid = GridIndex(radius)
+        for key, position in positions.items():
+            grid.insert(key, position)
+        grid_build = time.perf_counter() - start
+        start = time.perf_counter()
+        tree = KDTree(positions.items())
+        tree_build = time.perf_counter() - start
+        print(f"build: grid {grid_build:.2f}s, kd-tree {tree_build:.2f}s")
+
+        for label, run in (
+            ("brute radius", lambda c: brute_force_radius(positions, c,
+                                                          radius)),
+            ("grid radius", lambda c: grid.radius(c, radius)),
+            ("kd-tree radius", lambda c: tree.radius(c, radius)),
+            ("brute k-nearest", lambda c: brute_force_nearest(positions, c,
+                                                              k)),
+            ("grid k-nearest", lambda c: grid.nearest(c, k)),
+            ("kd-tree k-nearest", lambda c: tree.nearest(c, k)),
+        ):
+            start = time.perf_counter()
+            for center in centers:
+                run(center)
+            elapsed = (time.perf_counter() - start) / queries
+            print(f"{label}: {elapsed * 1000:.3f} ms/query")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--quick"]:
+        benchmark(sizes=(10 ** 4, 10 ** 5))
+    else:
+        benchmark()
@@ -1,6 +1,14 @@
 #!/usr/bin/env python3
 """Achievement Hunter - Track and analyze unique achievements with sets."""
 
+import random
+import re
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from itertools import filterfalse
+
 
 def count_occurrences(achievement, player_sets):
     """Count how many player sets contain a given achievement."""
@@ -11,6 +19,398 @@ def count_occurrences(achievement, player_sets):
     return count
 
 
+class AchievementCatalog:
+    """Assign each achievement a bit so players become int bitmasks.
+
+    Set algebra on players then becomes bitwise arithmetic: | for
+    union, & for intersection, a & ~b for difference and count()
+    (int.bit_count) for sizes, each costing one pass over machine
+    words instead of one hash lookup per achievement.
+    """
+
+    def __init__(self, achievements=()):
+        self.bits = {}
+        self.names = []
+        for achievement in achievements:
+            self.bit(achievement)
+
+    def __len__(self):
+        return len(self.names)
+
+    def bit(self, achievement):
+        """Return the bit index of achievement, assigning a new one."""
+        index = self.bits.get(achievement)
+        if index is None:
+            index = len(self.names)
+            self.bits[achievement] = index
+            self.names.append(achievement)
+        return index
+
+    def mask(self, achievements):
+        """Return the bitmask of a collection of achievements."""
+        mask = 0
+        for achievement in achievements:
+            mask |= 1 << self.bit(achievement)
+        return mask
+
+    def decode(self, mask):
+        """Return the set of achievement names whose bits are set."""
+        names = set()
+        while mask:
+            low = mask & -mask
+            names.add(self.names[low.bit_length() - 1])
+            mask ^= low
+        return names
+
+
+def count(mask):
+    """Return the number of achievements in a bitmask (popcount)."""
+    return mask.bit_count()
+
+
+def union_all(masks):
+    """Return the bitmask of achievements owned by any player."""
+    result = 0
+    for mask in masks:
+        result |= mask
+    return result
+
+
+def intersection_all(masks):
+    """Return the bitmask of achievements owned by every player."""
+    masks = iter(masks)
+    result = next(masks, 0)
+    for mask in masks:
+        result &= mask
+    return result
+
+
+def difference(left, right):
+    """Return the achievements of left that right does not have."""
+    return left & ~right
+
+
+def owned_by_exactly(masks, k, universe=None):
+    """Return the bitmask of achievements owned by exactly k players.
+
+    universe bounds the achievements considered and defaults to those
+    owned by anyone (pass a full catalogue mask to ask about k == 0).
+    Per-bit ownership counts are kept bit-sliced: planes[i] holds bit i
+    of every achievement's count, and adding a player is a ripple-carry
+    add over the planes, so each player costs O(log P) big-int ops.
+    """
+    masks = list(masks)
+    if universe is None:
+        universe = union_all(masks)
+    if k < 0 or k > len(masks):
+        return 0
+    if k == 1:
+        once = twice = 0
+        for mask in masks:
+            twice |= once & mask
+            once |= mask
+        return once & ~twice & universe
+
+    planes = [0] * len(masks).bit_length()
+    for mask in masks:
+        carry = mask
+        for i, plane in enumerate(planes):
+            if not carry:
+                break
+            planes[i] = plane ^ carry
+            carry &= plane
+
+    result = universe
+    for i, plane in enumerate(planes):
+        result &= plane if k >> i & 1 else ~plane
+    return result
+
+
+# Size ratio above which posting lists are galloped instead of hashed.
+GALLOP_RATIO = 16
+
+
+def intersect_postings(left, right):
+    """Return the sorted ids present in both sorted posting lists.
+
+    When one list is much shorter, walks it and gallops through the
+    longer one (exponential probe, then bisect), costing
+    O(m log(n / m)) for sizes m <= n. Lists of similar size are
+    intersected as sets, which stays in C.
+    """
+    if len(left) > len(right):
+        left, right = right, left
+    if len(right) < GALLOP_RATIO * len(left):
+        return array("q", filter(set(right).__contains__, left))
+    result = array("q")
+    size = len(right)
+    lo = 0
+    for player in left:
+        bound = 1
+        while lo + bound < size and right[lo + bound] < player:
+            bound <<= 1
+        lo = bisect_left(right, player, lo + (bound >> 1),
+                         min(lo + bound + 1, size))
+        if lo == size:
+            break
+        if right[lo] == player:
+            result.append(player)
+            lo += 1
+    return result
+
+
+def union_postings(left, right):
+    """Return the sorted ids present in either posting list.
+
+    Timsort finds the two sorted runs and merges them in linear time;
+    dict.fromkeys then drops the duplicates while keeping the order.
+    """
+    merged = list(left)
+    merged.extend(right)
+    merged.sort()
+    return array("q", dict.fromkeys(merged))
+
+
+def difference_postings(left, right):
+    """Return the sorted ids of left that are not in right.
+
+    Gallops through right when it is much longer than left.
+    """
+    if not right:
+        return array("q", left)
+    if len(right) < GALLOP_RATIO * len(left):
+        return array("q", filterfalse(set(right).__contains__, left))
+    result = array("q")
+    size = len(right)
+    lo = 0
+    for player in left:
+        bound = 1
+        while lo + bound < size and right[lo + bound] < player:
+            bound <<= 1
+        lo = bisect_left(right, player, lo + (bound >> 1),
+                         min(lo + bound + 1, size))
+        if lo < size and right[lo] == player:
+            lo += 1
+        else:
+            result.append(player)
+    return result
+
+
+class AchievementIndex:
+    """Inverted index from achievement to a sorted posting list.
+
+    Players get increasing integer ids as they are added, so appending
+    to array('q') posting lists keeps them sorted. query() evaluates
+    boolean expressions such as
+    "boss_slayer and speed_demon and not collector".
+    """
+
+    def __init__(self):
+        self.players = []
+        self.postings = {}
+
+    @classmethod
+    def from_sets(cls, player_sets, names=None):
+        """Index a list of achievement sets (names default to ids)."""
+        index = cls()
+        for i, achievements in enumerate(player_sets):
+            index.add_player(i if names is None else names[i], achievements)
+        return index
+
+    def add_player(self, name, achievements):
+        """Index a player's achievements and return its id."""
+        player = len(self.players)
+        self.players.append(name)
+        for achievement in achievements:
+            posting = self.postings.get(achievement)
+            if posting is None:
+                posting = self.postings[achievement] = array("q")
+            posting.append(player)
+        return player
+
+    def count(self, achievement):
+        """Return how many players have achievement (count_occurrences)."""
+        return len(self.postings.get(achievement, ()))
+
+    def posting(self, achievement):
+        """Return the sorted player ids having achievement."""
+        return self.postings.get(achievement, array("q"))
+
+    def query_ids(self, text):
+        """Return the sorted player ids matching a boolean query."""
+        return self._evaluate(parse_query(text))
+
+    def query(self, text):
+        """Return the names of the players matching a boolean query."""
+        return [self.players[i] for i in self.query_ids(text)]
+
+    def _evaluate(self, node):
+        kind = node[0]
+        if kind == "term":
+            return self.posting(node[1])
+        if kind == "not":
+            universe = array("q", range(len(self.players)))
+            return difference_postings(universe, self._evaluate(node[1]))
+        if kind == "or":
+            result = self._evaluate(node[1][0])
+            for child in node[1][1:]:
+                result = union_postings(result, self._evaluate(child))
+            return result
+
+        # "and": intersect the positive terms smallest first, then
+        # subtract the negated ones instead of building complements.
+        positives = [
+            self._evaluate(child) for child in node[1] if child[0] != "not"
+        ]
+        negatives = [
+            self._evaluate(child[1]) for child in node[1] if child[0] == "not"
+        ]
+        if positives:
+            positives.sort(key=len)
+            result = positives[0]
+            for posting in positives[1:]:
+                if not result:
+                    break
+                result = intersect_postings(result, posting)
+        else:
+            result = array("q", range(len(self.players)))
+        for posting in negatives:
+            result = difference_postings(result, posting)
+        return result
+
+
+_QUERY_TOKEN = re.compile(r"\s*(?:(\()|(\))|([^\s()]+))")
+_KEYWORDS = ("and", "or", "not")
+
+
+def parse_query(text):
+    """Parse a boolean achievement query into a tuple tree.
+
+    Grammar (and/or/not are case-insensitive, and binds tighter):
+        expr   := term ("or" term)*
+        term   := factor (["and"] factor)*
+        factor := "not" factor | "(" expr ")" | achievement
+    Nodes are ("term", name), ("not", node), ("and", [nodes]) and
+    ("or", [nodes]).
+    """
+    tokens = []
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        match = _QUERY_TOKEN.match(text, position)
+        if match is None:
+            raise ValueError(f"Invalid query near: {text[position:]}")
+        tokens.append(match.group(match.lastindex))
+        position = match.end()
+    tokens.append(None)
+    position = 0
+
+    def peek():
+        token = tokens[position]
+        if token is not None and token.lower() in _KEYWORDS:
+            return token.lower()
+        return token
+
+    def take():
+        nonlocal position
+        token = peek()
+        position += 1
+        return token
+
+    def expr():
+        terms = [term()]
+        while peek() == "or":
+            take()
+            terms.append(term())
+        return terms[0] if len(terms) == 1 else ("or", terms)
+
+    def term():
+        factors = [factor()]
+        while peek() not in (None, "or", ")"):
+            if peek() == "and":
+                take()
+            factors.append(factor())
+        return factors[0] if len(factors) == 1 else ("and", factors)
+
+    def factor():
+        token = take()
+        if token == "not":
+            return ("not", factor())
+        if token == "(":
+            node = expr()
+            if take() != ")":
+                raise ValueError("Missing closing parenthesis in query")
+            return node
+        if token in (None, ")", "and", "or"):
+            raise ValueError(f"Unexpected {token or 'end'} in query")
+        return ("term", token)
+
+    node = expr()
+    if peek() is not None:
+        raise ValueError(f"Unexpected {peek()} in query")
+    return node
+
+
+def benchmark_rare(players=10 ** 5, achievements=10 ** 3, per_player=20,
+                   seed=42):
+    """Time rare-achievement detection: string sets versus bitmasks."""
+    print("=== Rare Achievement Benchmark ===")
+    rng = random.Random(seed)
+    names = [f"achievement_{i}" for i in range(achievements)]
+    # Most achievements are common; the last tenth go to 1-3 players.
+    common = names[:achievements - achievements // 10]
+    player_sets = [
+        set(rng.sample(common, per_player)) for _ in range(players)
+    ]
+    for achievement in names[len(common):]:
+        for _ in range(rng.randint(1, 3)):
+            rng.choice(player_sets).add(achievement)
+    print(f"{players} players x {achievements} achievements")
+
+    start = time.perf_counter()
+    expected = set()
+    for achievement in set().union(*player_sets):
+        if count_occurrences(achievement, player_sets) == 1:
+            expected.add(achievement)
+    print(f"string sets: {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    catalog = AchievementCatalog(names)
+    masks = [catalog.mask(achieved) for achieved in player_sets]
+    print(f"bitmask build: {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    rare_mask = owned_by_exactly(masks, 1)
+    print(f"bitmasks: {time.perf_counter() - start:.3f}s")
+    identical = catalog.decode(rare_mask) == expected
+    print(f"rare achievements: {count(rare_mask)}, identical: {identical}")
+
+
+def benchmark_index(players=10 ** 6, achievements=100, per_player=5,
+                    seed=42):
+    """Time boolean queries on the inverted index."""
+    print("=== Achievement Index Benchmark ===")
+    rng = random.Random(seed)
+    names = [f"achievement_{i}" for i in range(achievements)]
+    start = time.perf_counter()
+    index = AchievementIndex()
+    for player in range(players):
+        index.add_player(player, rng.sample(names, per_player))
+    print(f"index {players} players: {time.perf_counter() - start:.3f}s")
+
+    for text in (
+        "achievement_1 and achievement_2",
+        "achievement_1 and achievement_2 and not achievement_3",
+        "(achievement_1 or achievement_2) and achievement_3",
+        "achievement_1 and achievement_2 and achievement_3 "
+        "and achievement_4",
+    ):
+        start = time.perf_counter()
+        matches = len(index.query_ids(text))
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{text}: {matches} players in {elapsed:.1f} ms")
+
+
 def main():
     """Demonstrate set-based achievement tracking and analytics."""
     print("=== Achievement Tracker System ===")
@@ -38,11 +438,9 @@ def main():
     common_all = alice.intersection(bob).intersection(charlie)
     print(f"Common to all players: {common_all}")
 
-    player_sets = [alice, bob, charlie]
-    rare_achievements = set()
-    for achievement in all_achievements:
-        if count_occurrences(achievement, player_sets) == 1:
-            rare_achievements.add(achievement)
+    catalog = AchievementCatalog()
+    player_masks = [catalog.mask(p) for p in (alice, bob, charlie)]
+    rare_achievements = catalog.decode(owned_by_exactly(player_masks, 1))
     print(f"Rare achievements (1 player): {rare_achievements}")
 
     alice_bob_common = alice.intersection(bob)
@@ -55,4 +453,9 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:] == ["--bench"]:
+        benchmark_rare()
+    elif sys.argv[1:] == ["--bench-index"]:
+        benchmark_index()
+    else:
+        main()
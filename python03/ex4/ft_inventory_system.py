@@ -1,6 +1,15 @@
 #!/usr/bin/env python3
 """Inventory Master - Manage inventories using dictionaries only (ex4)."""
 
+import argparse
+import heapq
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from array import array
+
 
 def compute_inventory_value(inventory):
     """Compute total inventory value (sum of qty * value)."""
@@ -30,6 +39,18 @@ def build_category_summary(inventory):
 
 def print_inventory(player_name, inventory):
     """Print a formatted inventory report for a player."""
+    _print_report(
+        player_name,
+        inventory,
+        compute_inventory_value(inventory),
+        compute_item_count(inventory),
+        build_category_summary(inventory),
+    )
+
+
+def _print_report(player_name, inventory, total_value, total_items,
+                  categories):
+    """Print the inventory report from precomputed totals."""
     print(f"=== {player_name}'s Inventory ===")
 
     for item_name, data in inventory.items():
@@ -44,10 +65,6 @@ def print_inventory(player_name, inventory):
             f"{qty}x @ {value} gold each = {item_total} gold"
         )
 
-    total_value = compute_inventory_value(inventory)
-    total_items = compute_item_count(inventory)
-    categories = build_category_summary(inventory)
-
     print(f"Inventory value: {total_value} gold")
     print(f"Item count: {total_items} items")
 
@@ -57,20 +74,21 @@ def print_inventory(player_name, inventory):
     print(f"Categories: {', '.join(parts)}")
 
 
-def transfer_item(from_inv, to_inv, item_name, qty):
-    """Transfer qty of item_name from from_inv to to_inv.
+def _move_item(from_inv, to_inv, item_name, qty):
+    """Move qty of item_name between inventories.
 
-    Returns True if successful, False otherwise.
+    Returns (moved item data, True if the receiver had to create the
+    item), or None if the transfer is not possible.
     """
     if qty <= 0:
-        return False
+        return None
 
     from_item = from_inv.get(item_name)
     if from_item is None:
-        return False
+        return None
 
     if from_item["qty"] < qty:
-        return False
+        return None
 
     # Remove from sender
     from_item["qty"] -= qty
@@ -84,38 +102,746 @@ def transfer_item(from_inv, to_inv, item_name, qty):
             "qty": qty,
             "value": from_item["value"],
         }
-    else:
-        to_item["qty"] += qty
+        return from_item, True
 
-    return True
+    to_item["qty"] += qty
+    return from_item, False
 
 
-def most_valuable_player(players):
-    """Return (name, total_value) of most valuable inventory."""
-    best_name = ""
-    best_value = -1
+def transfer_item(from_inv, to_inv, item_name, qty):
+    """Transfer qty of item_name from from_inv to to_inv.
+
+    Returns True if successful, False otherwise.
+    """
+    return _move_item(from_inv, to_inv, item_name, qty) is not None
 
-    for name, inv in players.items():
-        value = compute_inventory_value(inv)
-        if value > best_value:
-            best_value = value
-            best_name = name
 
-    return best_name, best_value
+class CodeTable:
+    """Intern strings such as categories or rarities as small int codes."""
 
+    def __init__(self):
+        self.codes = {}
+        self.names = []
+
+    def code(self, name):
+        """Return the code of name, assigning the next one if new."""
+        code = self.codes.get(name)
+        if code is None:
+            code = len(self.names)
+            self.codes[name] = code
+            self.names.append(name)
+        return code
 
-def most_items_player(players):
-    """Return (name, total_items) of player with most total qty."""
-    best_name = ""
-    best_count = -1
 
-    for name, inv in players.items():
-        count = compute_item_count(inv)
-        if count > best_count:
-            best_count = count
-            best_name = name
+CATEGORY_CODES = CodeTable()
+RARITY_CODES = CodeTable()
 
-    return best_name, best_count
+# Item fields stored as integer columns and as interned codes.
+_NUMERIC_FIELDS = ("qty", "value")
+_CODED_FIELDS = {"category": CATEGORY_CODES, "rarity": RARITY_CODES}
+
+
+class ItemView:
+    """Dict-like view of one row of a CompactInventory.
+
+    Supports data["qty"] reads and writes like the item dicts, so the
+    free functions and InventoryStore work on either representation.
+    A view is only valid until its item is deleted.
+    """
+
+    __slots__ = ("_inventory", "_row")
+
+    def __init__(self, inventory, row):
+        self._inventory = inventory
+        self._row = row
+
+    def __getitem__(self, key):
+        if key in _CODED_FIELDS:
+            column = getattr(self._inventory, "_" + key)
+            return _CODED_FIELDS[key].names[column[self._row]]
+        if key in _NUMERIC_FIELDS:
+            return getattr(self._inventory, "_" + key)[self._row]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in _CODED_FIELDS:
+            value = _CODED_FIELDS[key].code(value)
+        elif key not in _NUMERIC_FIELDS:
+            raise KeyError(key)
+        getattr(self._inventory, "_" + key)[self._row] = value
+
+    def get(self, key, default=None):
+        """Return the field value, or default if the field is unknown."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self):
+        """Return the item as a plain four-key dict."""
+        return {
+            "category": self["category"],
+            "rarity": self["rarity"],
+            "qty": self["qty"],
+            "value": self["value"],
+        }
+
+
+class CompactInventory:
+    """Inventory stored as parallel arrays instead of one dict per item.
+
+    Categories and rarities are interned as array('H') codes, qty and
+    value live in array('q') columns, and a single dict maps item name
+    to row. inv[item] returns an ItemView, so inv[item]["qty"] style
+    access keeps working. Deleting an item moves the last row into its
+    slot, so iteration order is not preserved across deletions.
+    """
+
+    __slots__ = ("_rows", "_names", "_category", "_rarity", "_qty",
+                 "_value")
+
+    def __init__(self):
+        self._rows = {}
+        self._names = []
+        self._category = array("H")
+        self._rarity = array("H")
+        self._qty = array("q")
+        self._value = array("q")
+
+    @classmethod
+    def from_dict(cls, inventory):
+        """Build a compact copy of a dict-of-dicts inventory."""
+        compact = cls()
+        for item_name, data in inventory.items():
+            compact[item_name] = data
+        return compact
+
+    def to_dict(self):
+        """Return the inventory as a plain dict of item dicts."""
+        return {name: view.to_dict() for name, view in self.items()}
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, item_name):
+        return item_name in self._rows
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __getitem__(self, item_name):
+        return ItemView(self, self._rows[item_name])
+
+    def get(self, item_name, default=None):
+        """Return the ItemView of item_name, or default if absent."""
+        row = self._rows.get(item_name)
+        if row is None:
+            return default
+        return ItemView(self, row)
+
+    def __setitem__(self, item_name, data):
+        row = self._rows.get(item_name)
+        if row is None:
+            self._rows[item_name] = len(self._names)
+            self._names.append(item_name)
+            self._category.append(CATEGORY_CODES.code(data["category"]))
+            self._rarity.append(RARITY_CODES.code(data["rarity"]))
+            self._qty.append(data["qty"])
+            self._value.append(data["value"])
+            return
+        view = ItemView(self, row)
+        for key in ("category", "rarity", "qty", "value"):
+            view[key] = data[key]
+
+    def __delitem__(self, item_name):
+        row = self._rows.pop(item_name)
+        last = len(self._names) - 1
+        if row != last:
+            moved = self._names[last]
+            self._names[row] = moved
+            self._rows[moved] = row
+            for column in (self._category, self._rarity, self._qty,
+                           self._value):
+                column[row] = column[last]
+        self._names.pop()
+        for column in (self._category, self._rarity, self._qty,
+                       self._value):
+            column.pop()
+
+    def keys(self):
+        """Return the item names, like dict.keys()."""
+        return list(self._names)
+
+    def values(self):
+        """Yield an ItemView per item."""
+        for row in range(len(self._names)):
+            yield ItemView(self, row)
+
+    def items(self):
+        """Yield (item name, ItemView) pairs."""
+        for row, item_name in enumerate(self._names):
+            yield item_name, ItemView(self, row)
+
+
+class InventoryStore:
+    """Player inventories with incrementally maintained aggregates.
+
+    Every player keeps a running inventory value, item count and
+    per-category summary, updated in O(1) by add_item, remove_item
+    and transfer_item. Leaderboards are heaps with lazy deletion:
+    players changed since the last query get a fresh entry pushed and
+    stale ones are discarded when they reach the top, so queries are
+    O(log n) amortized per change. Ties go to
+    the player added first, like the dict-scanning free functions.
+    With index_owners=False the ownership index behind owners,
+    items_owned_by and rarest_items is not maintained.
+    """
+
+    def __init__(self, players=None, compact=False, index_owners=True):
+        self.compact = compact
+        self.index_owners = index_owners
+        self.players = {}
+        self._order = {}
+        self._value = {}
+        self._count = {}
+        self._categories = {}
+        self._value_heap = []
+        self._count_heap = []
+        self._dirty = set()
+        self._owners = {}
+        self._rarity_owners = {}
+        self._owner_counts = {}
+        for name, inventory in (players or {}).items():
+            self.add_player(name, inventory)
+
+    def add_player(self, name, inventory=None):
+        """Register a player, adopting inventory (a dict of item dicts).
+
+        A compact store keeps a CompactInventory copy instead.
+        """
+        if name in self.players:
+            raise KeyError(f"Player {name} already exists")
+        if self.compact:
+            inventory = CompactInventory.from_dict(inventory or {})
+        elif inventory is None:
+            inventory = {}
+        self.players[name] = inventory
+        self._order[name] = len(self._order)
+        self._value[name] = compute_inventory_value(inventory)
+        self._count[name] = compute_item_count(inventory)
+        categories = {}
+        for data in inventory.values():
+            entry = categories.setdefault(data["category"], [0, 0])
+            entry[0] += data["qty"]
+            entry[1] += 1
+        self._categories[name] = categories
+        for item_name, data in inventory.items():
+            self._index_owner(name, item_name, data["rarity"], 1)
+        self._dirty.add(name)
+
+    def add_item(self, name, item_name, category, rarity, qty, value):
+        """Add qty of an item to a player, creating it if missing."""
+        if qty <= 0:
+            raise ValueError("Quantity must be positive")
+        inventory = self.players[name]
+        data = inventory.get(item_name)
+        if data is None:
+            data = {
+                "category": category,
+                "rarity": rarity,
+                "qty": 0,
+                "value": value,
+            }
+            inventory[item_name] = data
+            data = inventory[item_name]
+            self._track_item(name, item_name, data, 1)
+        data["qty"] += qty
+        self._adjust(name, data, qty)
+
+    def remove_item(self, name, item_name, qty):
+        """Remove qty of an item; returns False if the player lacks it.
+
+        The item entry is deleted once its quantity reaches zero.
+        """
+        inventory = self.players[name]
+        data = inventory.get(item_name)
+        if qty <= 0 or data is None or data["qty"] < qty:
+            return False
+        data["qty"] -= qty
+        self._adjust(name, data, -qty)
+        if data["qty"] == 0:
+            self._track_item(name, item_name, data, -1)
+            del inventory[item_name]
+        return True
+
+    def transfer_item(self, from_name, to_name, item_name, qty):
+        """Transfer qty of item_name between two players.
+
+        Returns True if successful, False otherwise.
+        """
+        return self._transfer(from_name, to_name, item_name, qty) is not None
+
+    def transfer_many(self, transfers, journal=None):
+        """Apply a batch of (from, to, item, qty) transfers atomically.
+
+        Either every transfer is applied or, if one of them fails, the
+        ones already applied are rolled back and False is returned; an
+        unknown player or malformed transfer is rolled back the same way
+        before its exception propagates.
+        When a TransferJournal is given, the batch is appended to it
+        with a single fsync before returning True. The batch is encoded
+        before anything is applied, so an unencodable batch raises with
+        no change; if the write fails the batch is rolled back and the
+        error re-raised.
+        """
+        transfers = list(transfers)
+        # Serialise first so an unencodable batch is never applied.
+        line = None if journal is None else journal.encode(transfers)
+        applied = []
+        try:
+            for transfer in transfers:
+                created = self._transfer(*transfer)
+                if created is None:
+                    self._rollback(applied)
+                    return False
+                applied.append((transfer, created))
+        except Exception:
+            # Unknown player (KeyError) or malformed transfer (TypeError).
+            self._rollback(applied)
+            raise
+        if journal is not None:
+            try:
+                journal.write_line(line)
+            except Exception:
+                self._rollback(applied)
+                raise
+        return True
+
+    def replay(self, journal_path):
+        """Re-apply every committed batch of a journal file.
+
+        Returns the number of batches applied.
+        """
+        batches = 0
+        for batch in TransferJournal.read(journal_path):
+            if not self.transfer_many(batch):
+                raise ValueError(
+                    f"Journal batch {batches + 1} does not apply cleanly"
+                )
+            batches += 1
+        return batches
+
+    def _transfer(self, from_name, to_name, item_name, qty):
+        """Transfer and update aggregates.
+
+        Returns None on failure, else whether the receiver's item entry
+        was created by this transfer.
+        """
+        moved = _move_item(
+            self.players[from_name], self.players[to_name], item_name, qty
+        )
+        if moved is None:
+            return None
+        data, created = moved
+        # The receiver's entry may carry its own value and category.
+        received = self.players[to_name][item_name]
+        if created:
+            self._track_item(to_name, item_name, received, 1)
+        self._adjust(from_name, data, -qty)
+        self._adjust(to_name, received, qty)
+        return created
+
+    def _rollback(self, applied):
+        """Undo (transfer, created) pairs, most recent first."""
+        for (from_name, to_name, item_name, qty), created in reversed(
+            applied
+        ):
+            data, _ = _move_item(
+                self.players[to_name], self.players[from_name],
+                item_name, qty,
+            )
+            self._adjust(to_name, data, -qty)
+            self._adjust(from_name, self.players[from_name][item_name], qty)
+            if created:
+                self._track_item(to_name, item_name, data, -1)
+                del self.players[to_name][item_name]
+
+    def inventory_value(self, name):
+        """Return the total value of a player's inventory."""
+        return self._value[name]
+
+    def item_count(self, name):
+        """Return the total item quantity of a player."""
+        return self._count[name]
+
+    def category_summary(self, name):
+        """Return a dict mapping category -> total qty for a player."""
+        return {
+            category: entry[0]
+            for category, entry in self._categories[name].items()
+        }
+
+    def owners(self, item_name):
+        """Return the set of players holding an entry for item_name."""
+        return frozenset(self._owners.get(item_name, ()))
+
+    def items_owned_by(self, count, rarity="rare"):
+        """Return the items of a rarity held by exactly count players."""
+        return list(self._owner_counts.get(rarity, {}).get(count, ()))
+
+    def rarest_items(self, rarity="rare"):
+        """Return a comma-separated string of items of a rarity
+        owned by exactly one player.
+        """
+        return ", ".join(self.items_owned_by(1, rarity))
+
+    def check_index(self):
+        """Rebuild the ownership index from scratch and compare.
+
+        Returns a list of human-readable discrepancies, empty when the
+        maintained index is consistent with the inventories.
+        """
+        owners = {}
+        rarity_owners = {}
+        for name, inventory in self.players.items():
+            for item_name, data in inventory.items():
+                owners.setdefault(item_name, set()).add(name)
+                key = (item_name, data["rarity"])
+                rarity_owners[key] = rarity_owners.get(key, 0) + 1
+        expected = {}
+        for (item_name, rarity), count in rarity_owners.items():
+            expected.setdefault(rarity, {}).setdefault(
+                count, set()
+            ).add(item_name)
+
+        problems = []
+        for item_name in sorted(owners.keys() | self._owners.keys()):
+            want = owners.get(item_name, set())
+            got = set(self._owners.get(item_name, ()))
+            if want != got:
+                problems.append(
+                    f"owners of {item_name}: expected {sorted(want)}, "
+                    f"indexed {sorted(got)}"
+                )
+        actual = {
+            rarity: {n: set(bucket) for n, bucket in buckets.items()}
+            for rarity, buckets in self._owner_counts.items()
+        }
+        for rarity in sorted(expected.keys() | actual.keys()):
+            if expected.get(rarity, {}) != actual.get(rarity, {}):
+                problems.append(
+                    f"{rarity} owner counts: expected "
+                    f"{expected.get(rarity, {})}, "
+                    f"indexed {actual.get(rarity, {})}"
+                )
+        return problems
+
+    def print_inventory(self, name):
+        """Print a formatted inventory report for a player."""
+        _print_report(
+            name,
+            self.players[name],
+            self._value[name],
+            self._count[name],
+            self.category_summary(name),
+        )
+
+    def most_valuable_player(self):
+        """Return (name, total_value) of most valuable inventory."""
+        return self._top(self._value_heap, self._value)
+
+    def most_items_player(self):
+        """Return (name, total_items) of player with most total qty."""
+        return self._top(self._count_heap, self._count)
+
+    def _track_item(self, name, item_name, data, delta):
+        """Record an item entry being created (+1) or deleted (-1)."""
+        categories = self._categories[name]
+        entry = categories.setdefault(data["category"], [0, 0])
+        entry[1] += delta
+        if entry[1] == 0:
+            del categories[data["category"]]
+        self._index_owner(name, item_name, data["rarity"], delta)
+
+    def _index_owner(self, name, item_name, rarity, delta):
+        """Update the inverted ownership index for one item entry.
+
+        Owner counts are kept per (item_name, rarity), so an item held
+        with different rarities is counted under each of them. The
+        rarity indexed for an entry is remembered and used when it is
+        removed, even if data["rarity"] was changed in place since.
+        """
+        if not self.index_owners:
+            return
+        holders = self._owners.setdefault(item_name, {})
+        if delta > 0:
+            if name in holders:
+                return
+            holders[name] = rarity
+        else:
+            rarity = holders.pop(name, None)
+            if not holders:
+                del self._owners[item_name]
+            if rarity is None:
+                return
+        key = (item_name, rarity)
+        old = self._rarity_owners.get(key, 0)
+        new = old + (1 if delta > 0 else -1)
+        if new:
+            self._rarity_owners[key] = new
+        else:
+            del self._rarity_owners[key]
+        counts = self._owner_counts.setdefault(rarity, {})
+        if old:
+            bucket = counts[old]
+            del bucket[item_name]
+            if not bucket:
+                del counts[old]
+        if new:
+            counts.setdefault(new, {})[item_name] = None
+        if not counts:
+            del self._owner_counts[rarity]
+
+    def _adjust(self, name, data, qty):
+        """Apply a qty change of one item to a player's aggregates."""
+        self._value[name] += qty * data["value"]
+        self._count[name] += qty
+        self._categories[name][data["category"]][0] += qty
+        self._dirty.add(name)
+
+    def _flush(self):
+        """Push fresh heap entries for players changed since last query."""
+        for name in self._dirty:
+            order = self._order[name]
+            heapq.heappush(
+                self._value_heap, (-self._value[name], order, name)
+            )
+            heapq.heappush(
+                self._count_heap, (-self._count[name], order, name)
+            )
+        self._dirty.clear()
+        if len(self._value_heap) > 2 * len(self.players) + 64:
+            self._compact()
+
+    def _compact(self):
+        """Rebuild both heaps from the current totals only."""
+        for heap, totals in (
+            (self._value_heap, self._value),
+            (self._count_heap, self._count),
+        ):
+            heap[:] = [
+                (-total, self._order[name], name)
+                for name, total in totals.items()
+            ]
+            heapq.heapify(heap)
+
+    def _top(self, heap, totals):
+        """Pop stale entries until the heap top matches current totals."""
+        self._flush()
+        while heap:
+            total, _, name = heap[0]
+            if totals[name] == -total:
+                return name, -total
+            heapq.heappop(heap)
+        return "", -1
+
+
+class TransferJournal:
+    """Append-only journal of transfer batches (one JSON line each).
+
+    Every batch is written and fsynced as a unit (group commit). A
+    crash can only leave a torn last line, which read() ignores and
+    which is truncated away when the journal is reopened, so replaying
+    yields exactly the batches that were acknowledged.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._truncate_torn_tail(path)
+        self.file = open(path, "a", encoding="utf-8")
+
+    @staticmethod
+    def _truncate_torn_tail(path, chunk=1 << 16):
+        """Cut a torn last line left by a crash back to the last newline.
+
+        Without this the next batch would be appended to the torn bytes
+        and turn them into a line that no longer parses.
+        """
+        try:
+            file = open(path, "r+b")
+        except FileNotFoundError:
+            return
+        with file:
+            end = file.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                start = max(0, position - chunk)
+                file.seek(start)
+                newline = file.read(position - start).rfind(b"\n")
+                if newline != -1:
+                    position = start + newline + 1
+                    break
+                position = start
+            if position != end:
+                file.truncate(position)
+
+    @staticmethod
+    def encode(transfers):
+        """Return the journal line of one batch of transfers."""
+        return json.dumps(transfers, separators=(",", ":")) + "\n"
+
+    def append(self, transfers):
+        """Durably append one batch of (from, to, item, qty) transfers."""
+        self.write_line(self.encode(transfers))
+
+    def write_line(self, line):
+        """Durably append one line returned by encode."""
+        self.file.write(line)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        """Close the journal file."""
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    @staticmethod
+    def read(path):
+        """Yield the committed batches of a journal as lists of tuples."""
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                for line in file:
+                    if not line.endswith("\n"):
+                        return
+                    yield [tuple(transfer) for transfer in json.loads(line)]
+        except FileNotFoundError:
+            return
+
+
+def benchmark_transfers(total=10 ** 6, batch_size=1000, players=1000):
+    """Print journaled transfer_many throughput in transfers/sec."""
+    print("=== Journaled Transfer Benchmark ===")
+    store = InventoryStore()
+    names = [f"player{i}" for i in range(players)]
+    for name in names:
+        store.add_player(name)
+        store.add_item(name, "gold_coin", "currency", "common", 10 ** 9, 1)
+    batches = []
+    for start in range(0, total, batch_size):
+        batches.append([
+            (names[i % players], names[(i * 7 + 1) % players],
+             "gold_coin", 1)
+            for i in range(start, min(start + batch_size, total))
+        ])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "transfers.journal")
+        with TransferJournal(path) as journal:
+            start = time.perf_counter()
+            for batch in batches:
+                store.transfer_many(batch, journal)
+            elapsed = time.perf_counter() - start
+        print(
+            f"{total} transfers in batches of {batch_size}: "
+            f"{total / elapsed:,.0f} transfers/s "
+            f"({len(batches)} fsyncs)"
+        )
+
+        replayed = InventoryStore()
+        for name in names:
+            replayed.add_player(name)
+            replayed.add_item(
+                name, "gold_coin", "currency", "common", 10 ** 9, 1
+            )
+        start = time.perf_counter()
+        replayed.replay(path)
+        elapsed = time.perf_counter() - start
+        print(f"Replay: {total / elapsed:,.0f} transfers/s")
+
+
+def check_journal_recovery():
+    """Replay a journal across a simulated crash and a reopen.
+
+    A torn batch is written after two committed ones; the journal is
+    then reopened and appended to, and the replay must apply exactly
+    the committed batches. Raises ValueError on any mismatch.
+    """
+    def fresh_store():
+        store = InventoryStore()
+        for name in ("A", "B"):
+            store.add_player(name)
+            store.add_item(name, "gold", "currency", "common", 100, 1)
+        return store
+
+    store = fresh_store()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "transfers.journal")
+        with TransferJournal(path) as journal:
+            store.transfer_many([("A", "B", "gold", 5)], journal)
+            store.transfer_many([("B", "A", "gold", 1)], journal)
+        with open(path, "a", encoding="utf-8") as file:
+            file.write('[["A","B","go')
+        with TransferJournal(path) as journal:
+            store.transfer_many([("A", "B", "gold", 2)], journal)
+
+        replayed = fresh_store()
+        batches = replayed.replay(path)
+    if batches != 3:
+        raise ValueError(f"Replayed {batches} batches instead of 3")
+    for name in ("A", "B"):
+        if replayed.item_count(name) != store.item_count(name):
+            raise ValueError(f"Replay of {name} differs after a crash")
+    print("Journal replays committed batches after a simulated crash")
+
+
+def benchmark_memory(players=10 ** 4, items_per_player=100):
+    """Print tracemalloc bytes per item for dict and compact inventories.
+
+    Item names are created before tracing, so only the per-item
+    structures are measured.
+    """
+    print("=== Inventory Memory Benchmark ===")
+    item_names = [f"item{i}" for i in range(items_per_player)]
+    categories = ("weapon", "armor", "consumable", "accessory")
+    rarities = ("common", "uncommon", "rare")
+    total = players * items_per_player
+
+    def build(make_inventory):
+        tracemalloc.start()
+        inventories = []
+        for p in range(players):
+            inventory = make_inventory()
+            for i, item_name in enumerate(item_names):
+                inventory[item_name] = {
+                    "category": categories[i % len(categories)],
+                    "rarity": rarities[(p + i) % len(rarities)],
+                    "qty": 1000 + p + i,
+                    "value": 500 + i,
+                }
+            inventories.append(inventory)
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return used
+
+    for label, factory in (("dict", dict), ("compact", CompactInventory)):
+        used = build(factory)
+        print(f"{label}: {total} items, {used / total:.1f} bytes/item")
+
+
+def most_valuable_player(players):
+    """Return (name, total_value) of most valuable inventory."""
+    return InventoryStore(players, index_owners=False).most_valuable_player()
+
+
+def most_items_player(players):
+    """Return (name, total_items) of player with most total qty."""
+    return InventoryStore(players, index_owners=False).most_items_player()
 
 
 def rarest_items(players):
@@ -176,11 +902,12 @@ def main():
     players = {}
     players.update({"Alice": alice_inventory})
     players.update({"Bob": bob_inventory})
+    store = InventoryStore(players)
 
-    print_inventory("Alice", alice_inventory)
+    store.print_inventory("Alice")
 
     print("=== Transaction: Alice gives Bob 2 potions ===")
-    if transfer_item(alice_inventory, bob_inventory, "potion", 2):
+    if store.transfer_item("Alice", "Bob", "potion", 2):
         print("Transaction successful!")
     else:
         print("Transaction failed!")
@@ -192,14 +919,35 @@ def main():
     print(f"Bob potions: {bob_potions}")
 
     print("=== Inventory Analytics ===")
-    name, value = most_valuable_player(players)
+    name, value = store.most_valuable_player()
     print(f"Most valuable player: {name} ({value} gold)")
 
-    name, count = most_items_player(players)
+    name, count = store.most_items_player()
     print(f"Most items: {name} ({count} items)")
 
-    print(f"Rarest items: {rarest_items(players)}")
+    print(f"Rarest items: {store.rarest_items()}")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--bench-transfers", action="store_true",
+        help="benchmark journaled batched transfers",
+    )
+    parser.add_argument(
+        "--bench-memory", action="store_true",
+        help="compare bytes per item of dict and compact inventories",
+    )
+    parser.add_argument(
+        "--check-journal", action="store_true",
+        help="replay a journal across a simulated crash",
+    )
+    args = parser.parse_args()
+    if args.bench_transfers:
+        benchmark_transfers()
+    elif args.bench_memory:
+        benchmark_memory()
+    elif args.check_journal:
+        check_journal_recovery()
+    else:
+        main()
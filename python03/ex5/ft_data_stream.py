@@ -1,10 +1,43 @@
 #!/usr/bin/env python3
+"""Game Data Stream Processor - generators and streaming analytics."""
+
+import argparse
+import io
+import math
+import os
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, reduce
+from itertools import compress, islice
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from ft_stream_metrics import MetricsRecorder, peak_rss_bytes
+
+PLAYERS = ("alice", "bob", "charlie", "dina", "youssef")
+ACTIONS = ("killed monster", "found treasure", "leveled up")
+ACTION_TREASURE = ACTIONS.index("found treasure")
+ACTION_LEVEL_UP = ACTIONS.index("leveled up")
+HIGH_LEVEL = 10
+
+# Events per chunk yielded by game_event_batches.
+BATCH_SIZE = 1 << 16
+
+# Events per task handed to a worker in sharded mode.
+SHARD_SIZE = 1 << 22
 
 
 def game_event_stream(count):
     """Yield simulated game events one by one (streaming)."""
-    players = ("alice", "bob", "charlie", "dina", "youssef")
-    actions = ("killed monster", "found treasure", "leveled up")
+    players = PLAYERS
+    actions = ACTIONS
 
     for i in range(1, count + 1):
         player = players[(i - 1) % len(players)]
@@ -14,35 +47,402 @@ def game_event_stream(count):
         yield (i, player, level, action)
 
 
-def fibonacci_stream():
-    """Infinite Fibonacci generator."""
-    a = 0
-    b = 1
+def game_event_batches(count, batch_size=BATCH_SIZE, first=1):
+    """Yield the same events as game_event_stream in fixed-size chunks.
+
+    Each chunk is a tuple of columns (event_id, player index, level,
+    action code); player and action codes index PLAYERS and ACTIONS.
+    Columns are NumPy arrays when NumPy is installed, array.array
+    otherwise. first is the id of the first event, so any slice of the
+    stream can be generated on its own.
+    """
+    end = first + count
+    for start in range(first, end, batch_size):
+        stop = min(start + batch_size, end)
+        if np is not None:
+            ids = np.arange(start, stop, dtype=np.int64)
+            players = ((ids - 1) % len(PLAYERS)).astype(np.int8)
+            levels = ((ids * 7) % 20 + 1).astype(np.int8)
+            actions = ((ids - 1) % len(ACTIONS)).astype(np.int8)
+        else:
+            ids = array("q", range(start, stop))
+            players = array("b", [(i - 1) % len(PLAYERS) for i in ids])
+            levels = array("b", [(i * 7) % 20 + 1 for i in ids])
+            actions = array("b", [(i - 1) % len(ACTIONS) for i in ids])
+        yield ids, players, levels, actions
+
+
+def new_analytics():
+    """Return an empty stream analytics counter dict."""
+    return {"processed": 0, "high_level": 0, "treasure": 0, "level_up": 0}
+
+
+def analyze_events(events):
+    """Compute stream analytics over (id, player, level, action) tuples."""
+    stats = new_analytics()
+    for _, _, level, action in events:
+        stats["processed"] += 1
+
+        if level >= HIGH_LEVEL:
+            stats["high_level"] += 1
+
+        if action == "found treasure":
+            stats["treasure"] += 1
+
+        if action == "leveled up":
+            stats["level_up"] += 1
+    return stats
+
+
+def aggregate_batch(batch):
+    """Return the stream analytics of one columnar chunk."""
+    ids, _, levels, actions = batch
+    stats = new_analytics()
+    stats["processed"] = len(ids)
+    if np is not None:
+        per_action = np.bincount(actions, minlength=len(ACTIONS))
+        stats["high_level"] = int(np.count_nonzero(levels >= HIGH_LEVEL))
+    else:
+        per_action = Counter(actions)
+        stats["high_level"] = sum(
+            n for level, n in Counter(levels).items() if level >= HIGH_LEVEL
+        )
+    stats["treasure"] = int(per_action[ACTION_TREASURE])
+    stats["level_up"] = int(per_action[ACTION_LEVEL_UP])
+    return stats
+
+
+def merge_analytics(left, right):
+    """Return the sum of two analytics dicts (associative reducer)."""
+    return {key: left[key] + right[key] for key in left}
+
+
+def analyze_batches(batches):
+    """Compute stream analytics over columnar chunks."""
+    return reduce(merge_analytics, map(aggregate_batch, batches),
+                  new_analytics())
+
+
+def analyze_shard(shard):
+    """Generate and aggregate the events of one (first, count) shard."""
+    first, count, batch_size = shard
+    return analyze_batches(game_event_batches(count, batch_size, first))
+
+
+def analyze_sharded(count, workers=None, shard_size=SHARD_SIZE,
+                    batch_size=BATCH_SIZE):
+    """Compute stream analytics with the event range split over processes.
+
+    game_event_stream is a pure function of the event index, so each
+    worker generates its own slice and only partial counters travel
+    back to be merged.
+    """
+    shards = [
+        (first, min(shard_size, count + 1 - first), batch_size)
+        for first in range(1, count + 1, shard_size)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return reduce(merge_analytics, executor.map(analyze_shard, shards),
+                      new_analytics())
+
+
+def benchmark_sharding(count=10 ** 8, shard_size=SHARD_SIZE,
+                       batch_size=BATCH_SIZE):
+    """Print sharded throughput in events/sec at 1, 2, 4 and N workers."""
+    print("=== Sharded Stream Benchmark ===")
+    cores = os.cpu_count() or 1
+    print(f"{count} events, {cores} cores available")
+    for workers in sorted({1, 2, 4, cores}):
+        start = time.perf_counter()
+        analyze_sharded(count, workers, shard_size, batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"{workers} workers: {count / elapsed:,.0f} events/s")
+
+
+# Distance between cached Fibonacci checkpoints and how many to keep.
+FIB_CHECKPOINT_STRIDE = 256
+FIB_CHECKPOINT_CACHE = 64
+
+
+def _fib_pair(n):
+    """Return (F(n), F(n + 1)) by fast doubling, O(log n) multiplications.
+
+    F(2k) = F(k) * (2 F(k+1) - F(k)) and F(2k+1) = F(k)^2 + F(k+1)^2.
+    """
+    a, b = 0, 1
+    for bit in bin(n)[2:]:
+        c = a * (2 * b - a)
+        d = a * a + b * b
+        if bit == "1":
+            a, b = d, c + d
+        else:
+            a, b = c, d
+    return a, b
+
+
+@lru_cache(maxsize=FIB_CHECKPOINT_CACHE)
+def _fib_checkpoint(base):
+    """Return the cached (F(base), F(base + 1)) checkpoint pair."""
+    return _fib_pair(base)
+
+
+def _fib_seed(n, cached):
+    """Return (F(n), F(n + 1)), stepping from a checkpoint if cached."""
+    if n < 0:
+        raise ValueError("Fibonacci index must be >= 0")
+    if not cached:
+        return _fib_pair(n)
+    base = n - n % FIB_CHECKPOINT_STRIDE
+    a, b = _fib_checkpoint(base)
+    for _ in range(n - base):
+        a, b = b, a + b
+    return a, b
+
+
+def fib(n, cached=True):
+    """Return the n-th Fibonacci number (fib(0) == 0).
+
+    With cached=True the pair at the checkpoint below n is kept in a
+    bounded LRU, so nearby queries only cost a few additions.
+    """
+    return _fib_seed(n, cached)[0]
+
+
+def fib_range(start, stop, cached=True):
+    """Yield F(start), ..., F(stop - 1), jumping straight to start."""
+    if stop <= start:
+        return
+    a, b = _fib_seed(start, cached)
+    for _ in range(stop - start):
+        yield a
+        a, b = b, a + b
+
+
+def fibonacci_stream(start=0):
+    """Infinite Fibonacci generator, beginning at F(start)."""
+    a, b = _fib_seed(start, cached=True)
     while True:
         yield a
         a, b = b, a + b
 
 
-def prime_stream():
-    """Infinite prime number generator."""
+# Segment size in bytes (one flag per integer); 256 KiB fits in L2.
+SEGMENT_SIZE = 1 << 18
+
+# Largest base prime is_prime trial-divides by; beyond its square the
+# base table stays put and Miller-Rabin is used instead.
+IS_PRIME_TABLE_LIMIT = 1 << 16
+
+_MILLER_RABIN_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+# Cached base-prime table shared by every sieve helper below.
+_base_primes = [2, 3, 5, 7]
+_base_limit = 10
+
+
+def _extend_base_primes(limit):
+    """Grow the cached base-prime table to cover every prime <= limit."""
+    global _base_limit
+    if limit <= _base_limit:
+        return
+    limit = max(limit, _base_limit * 2)
+    sieve = bytearray([1]) * (limit + 1)
+    sieve[0] = sieve[1] = 0
+    for p in range(2, math.isqrt(limit) + 1):
+        if sieve[p]:
+            sieve[p * p::p] = bytes(len(range(p * p, limit + 1, p)))
+    _base_primes[:] = compress(range(limit + 1), sieve)
+    _base_limit = limit
+
+
+def _sieve_segment(low, high):
+    """Return a bytearray flagging the primes in [low, high)."""
+    size = high - low
+    segment = bytearray([1]) * size
+    _extend_base_primes(math.isqrt(high - 1))
+    for p in _base_primes:
+        square = p * p
+        if square >= high:
+            break
+        start = max(square, -(-low // p) * p) - low
+        if start < size:
+            segment[start::p] = bytes((size - 1 - start) // p + 1)
+    for n in range(low, min(2, high)):
+        segment[n - low] = 0
+    return segment
+
+
+def _segments(segment_size, stop=None):
+    """Yield (low, segment) pairs walking the integers from 0 upward."""
+    low = 0
+    while stop is None or low < stop:
+        high = low + segment_size
+        if stop is not None:
+            high = min(high, stop)
+        yield low, _sieve_segment(low, high)
+        low = high
+
+
+def prime_stream(segment_size=SEGMENT_SIZE):
+    """Infinite prime number generator (segmented sieve)."""
+    for low, segment in _segments(segment_size):
+        yield from compress(range(low, low + len(segment)), segment)
+
+
+def primes_up_to(n, segment_size=SEGMENT_SIZE):
+    """Return the list of every prime <= n."""
+    primes = []
+    for low, segment in _segments(segment_size, n + 1):
+        primes.extend(compress(range(low, low + len(segment)), segment))
+    return primes
+
+
+def nth_prime(k, segment_size=SEGMENT_SIZE):
+    """Return the k-th prime (nth_prime(1) == 2)."""
+    if k < 1:
+        raise ValueError("k must be >= 1")
+    if k < 6:
+        return (2, 3, 5, 7, 11)[k - 1]
+    # Rosser's bound: p_k < k (ln k + ln ln k) for k >= 6.
+    log_k = math.log(k)
+    limit = int(k * (log_k + math.log(log_k))) + 1
+    seen = 0
+    for low, segment in _segments(segment_size, limit + 1):
+        found = segment.count(1)
+        if seen + found >= k:
+            primes = compress(range(low, low + len(segment)), segment)
+            return next(islice(primes, k - seen - 1, None))
+        seen += found
+    raise ArithmeticError(f"prime #{k} not found below {limit}")
+
+
+def is_prime(n):
+    """Return True if n is prime.
+
+    Up to IS_PRIME_TABLE_LIMIT ** 2 this trial-divides by the cached
+    base-prime table, which never grows past IS_PRIME_TABLE_LIMIT;
+    larger n (e.g. 64-bit event IDs) use Miller-Rabin with the first
+    twelve prime bases, which is deterministic below 3.3 * 10 ** 24.
+    """
+    if n < 2:
+        return False
+    if n <= _base_limit:
+        index = bisect_left(_base_primes, n)
+        return index < len(_base_primes) and _base_primes[index] == n
+    root = math.isqrt(n)
+    if root > IS_PRIME_TABLE_LIMIT:
+        return _miller_rabin(n)
+    _extend_base_primes(root)
+    for p in _base_primes:
+        if p > root:
+            break
+        if n % p == 0:
+            return False
+    return True
+
+
+def _miller_rabin(n):
+    """Miller-Rabin test of n > the largest base."""
+    for p in _MILLER_RABIN_BASES:
+        if n % p == 0:
+            return n == p
+    d = n - 1
+    shift = 0
+    while d % 2 == 0:
+        d //= 2
+        shift += 1
+    for base in _MILLER_RABIN_BASES:
+        x = pow(base, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(shift - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def trial_division_stream():
+    """Infinite prime generator by trial division (benchmark baseline)."""
     n = 2
     while True:
-        is_prime = True
+        prime = True
         d = 2
         while d * d <= n:
             if n % d == 0:
-                is_prime = False
+                prime = False
                 break
             d += 1
 
-        if is_prime:
+        if prime:
             yield n
 
         n += 1
 
 
+def benchmark_primes(counts=(10 ** 5, 10 ** 6, 10 ** 7),
+                     trial_limit=10 ** 5):
+    """Compare sieve and trial-division throughput in primes/sec.
+
+    Trial division is skipped above trial_limit primes, where it would
+    run for minutes.
+    """
+    print("=== Prime Stream Benchmark ===")
+    for count in counts:
+        start = time.perf_counter()
+        deque(islice(prime_stream(), count), maxlen=0)
+        sieve_time = time.perf_counter() - start
+        line = f"{count} primes: sieve {count / sieve_time:,.0f}/s"
+
+        if count <= trial_limit:
+            start = time.perf_counter()
+            deque(islice(trial_division_stream(), count), maxlen=0)
+            trial_time = time.perf_counter() - start
+            line += (
+                f", trial division {count / trial_time:,.0f}/s "
+                f"(x{trial_time / sieve_time:.1f})"
+            )
+        else:
+            line += ", trial division skipped"
+        print(line)
+
+
+# Values formatted per write() call by write_first_n.
+JOIN_CHUNK = 4096
+
+
+def write_first_n(gen, n, sink=None, sep=", ", chunk=JOIN_CHUNK):
+    """Write the first n values from gen to sink, separated by sep.
+
+    Values are formatted and written chunk at a time, so the full
+    string is never built; sink defaults to sys.stdout. Returns the
+    number of values written.
+    """
+    if sink is None:
+        sink = sys.stdout
+    values = map(str, islice(gen, n))
+    written = 0
+    while True:
+        parts = list(islice(values, chunk))
+        if not parts:
+            return written
+        if written:
+            sink.write(sep)
+        sink.write(sep.join(parts))
+        written += len(parts)
+
+
 def join_first_n(gen, n):
     """Return the first n values from gen as a comma-separated string."""
+    buffer = io.StringIO()
+    write_first_n(gen, n, buffer)
+    return buffer.getvalue()
+
+
+def _concat_join_first_n(gen, n):
+    """Build the joined string by repeated += (benchmark baseline)."""
     result = ""
     i = 0
     for value in gen:
@@ -55,54 +455,186 @@ def join_first_n(gen, n):
     return result
 
 
-def main():
-    print("=== Game Data Stream Processor ===")
+def benchmark_join(sizes=(10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6)):
+    """Print join time per value for growing n (primes as input)."""
+    print("=== Join Benchmark ===")
+    primes = list(islice(prime_stream(), sizes[-1]))
+    for n in sizes:
+        start = time.perf_counter()
+        write_first_n(iter(primes), n, io.StringIO())
+        stream_time = time.perf_counter() - start
 
-    total_events = 1000
-    print(f"Processing {total_events} game events...")
+        start = time.perf_counter()
+        _concat_join_first_n(iter(primes), n)
+        concat_time = time.perf_counter() - start
+        print(
+            f"n={n}: streaming {stream_time * 1e9 / n:.0f} ns/value, "
+            f"concatenation {concat_time * 1e9 / n:.0f} ns/value"
+        )
 
-    processed = 0
-    high_level_players = 0
-    treasure_events = 0
-    level_up_events = 0
 
-    for event_id, player, level, action in game_event_stream(total_events):
-        processed += 1
+def benchmark_metrics(total_events=10 ** 6, calls=20, rounds=5):
+    """Print the overhead of instrumenting the event stage.
 
-        if level >= 10:
-            high_level_players += 1
+    The stage is run calls times per round, bare and instrumented
+    with sample_every 1 and 10; rounds alternate between the variants
+    and the best round of each is kept.
+    """
+    print("=== Metrics Overhead Benchmark ===")
+    size = total_events // calls
+    variants = {"bare": game_event_stream}
+    for sample_every in (1, 10):
+        recorder = MetricsRecorder(sample_every=sample_every)
+        variants[f"instrumented, sample_every={sample_every}"] = (
+            recorder.instrument()(game_event_stream)
+        )
+    best = dict.fromkeys(variants, float("inf"))
+    for _ in range(rounds):
+        for label, stream in variants.items():
+            start = time.perf_counter()
+            for _ in range(calls):
+                analyze_events(stream(size))
+            best[label] = min(best[label], time.perf_counter() - start)
 
-        if action == "found treasure":
-            treasure_events += 1
+    bare = best["bare"]
+    for label, elapsed in best.items():
+        line = f"{label}: {calls * size / elapsed:,.0f} events/s"
+        if label != "bare":
+            line += f" ({(elapsed / bare - 1) * 100:+.1f}% time)"
+        print(line)
 
-        if action == "leveled up":
-            level_up_events += 1
 
-        if event_id <= 3:
-            print(
-                f"Event {event_id}: Player {player} "
-                f"(level {level}) {action}"
+def parse_args(argv):
+    """Parse the command line of the stream processor."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--events", type=int,
+        help="number of game events to process (default: 1000, or 10^8 "
+             "with --bench-sharding)",
+    )
+    parser.add_argument(
+        "--batched", action="store_true",
+        help="process events in columnar chunks instead of tuples",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=BATCH_SIZE,
+        help=f"events per chunk in batched mode (default: {BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="worker processes; more than 1 enables sharded mode",
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=SHARD_SIZE,
+        help=f"events per worker task (default: {SHARD_SIZE})",
+    )
+    parser.add_argument(
+        "--trace-memory", action="store_true",
+        help="record tracemalloc peaks (slower than the default sampling)",
+    )
+    parser.add_argument(
+        "--sample-every", type=int, default=1, metavar="N",
+        help="measure only one call out of N of instrumented stages "
+             "(default: 1, every call)",
+    )
+    parser.add_argument(
+        "--bench-metrics", action="store_true",
+        help="measure the overhead of stage instrumentation",
+    )
+    parser.add_argument(
+        "--metrics-json", metavar="PATH",
+        help="also write stage metrics as JSON to PATH ('-' for stdout)",
+    )
+    parser.add_argument(
+        "--bench-primes", action="store_true",
+        help="benchmark the prime sieve against trial division",
+    )
+    parser.add_argument(
+        "--bench-join", action="store_true",
+        help="benchmark joining the first n values for growing n",
+    )
+    parser.add_argument(
+        "--bench-sharding", action="store_true",
+        help="benchmark sharded throughput at 1, 2, 4 and N workers",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.bench_primes:
+        benchmark_primes()
+        return
+    if args.bench_join:
+        benchmark_join()
+        return
+    if args.bench_metrics:
+        benchmark_metrics(args.events or 10 ** 6)
+        return
+    if args.bench_sharding:
+        benchmark_sharding(args.events or 10 ** 8, args.chunk_size,
+                           args.batch_size)
+        return
+
+    print("=== Game Data Stream Processor ===")
+
+    total_events = args.events or 1000
+    print(f"Processing {total_events} game events...")
+
+    for event_id, player, level, action in islice(
+        game_event_stream(total_events), 3
+    ):
+        print(
+            f"Event {event_id}: Player {player} "
+            f"(level {level}) {action}"
+        )
+
+    recorder = MetricsRecorder(trace_memory=args.trace_memory,
+                               sample_every=args.sample_every)
+    with recorder.stage("game_event_stream") as stage:
+        if args.workers > 1:
+            stats = analyze_sharded(total_events, args.workers,
+                                    args.chunk_size, args.batch_size)
+        elif args.batched:
+            stats = analyze_batches(
+                game_event_batches(total_events, args.batch_size)
             )
+        else:
+            stats = analyze_events(game_event_stream(total_events))
+        stage.add_events(stats["processed"])
 
     print("...")
     print("=== Stream Analytics ===")
-    print(f"Total events processed: {processed}")
-    print(f"High-level players (10+): {high_level_players}")
-    print(f"Treasure events: {treasure_events}")
-    print(f"Level-up events: {level_up_events}")
-    print("Memory usage: Constant (streaming)")
-    print("Processing time: 0.045 seconds")
+    print(f"Total events processed: {stats['processed']}")
+    print(f"High-level players (10+): {stats['high_level']}")
+    print(f"Treasure events: {stats['treasure']}")
+    print(f"Level-up events: {stats['level_up']}")
+
+    fibonacci = recorder.instrument("fibonacci_stream")(fibonacci_stream)
+    primes = recorder.instrument("prime_stream")(prime_stream)
 
     print("=== Generator Demonstration ===")
     print(
         "Fibonacci sequence (first 10): "
-        f"{join_first_n(fibonacci_stream(), 10)}"
+        f"{join_first_n(fibonacci(), 10)}"
     )
     print(
         "Prime numbers (first 5): "
-        f"{join_first_n(prime_stream(), 5)}"
+        f"{join_first_n(primes(), 5)}"
     )
 
+    print("=== Stream Metrics ===")
+    for line in recorder.report():
+        print(line)
+    if not args.trace_memory and peak_rss_bytes() is None:
+        print("Memory usage: not available on this platform")
+
+    if args.metrics_json == "-":
+        print(recorder.to_json())
+    elif args.metrics_json:
+        with open(args.metrics_json, "w") as file:
+            file.write(recorder.to_json() + "\n")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Stream Metrics - time and memory instrumentation for generator stages."""
+
+import functools
+import json
+import sys
+import time
+import tracemalloc
+from itertools import count
+from operator import itemgetter
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+_first = itemgetter(0)
+
+
+def peak_rss_bytes():
+    """Return the peak resident set size of this process, or None."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux and the BSDs report kilobytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageMetrics:
+    """Measurements recorded for one pipeline stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self.events = 0
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.peak_traced = None
+        self.peak_rss = None
+
+    @property
+    def events_per_sec(self):
+        """Return the stage throughput, 0.0 for an instantaneous stage."""
+        if self.wall_time <= 0:
+            return 0.0
+        return self.events / self.wall_time
+
+    def as_dict(self):
+        """Return the metrics as a JSON-serialisable dict."""
+        return {
+            "stage": self.name,
+            "events": self.events,
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+            "events_per_sec": self.events_per_sec,
+            "peak_traced_bytes": self.peak_traced,
+            "peak_rss_bytes": self.peak_rss,
+        }
+
+
+class _Stage:
+    """Context manager measuring the code run inside a with block."""
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.metrics = StageMetrics(name)
+        self._counters = []
+        self._started_tracing = False
+
+    def wrap(self, iterable):
+        """Return iterable unchanged except that its items get counted.
+
+        Counting is done by zipping against itertools.count, so no
+        Python-level code runs per item.
+        """
+        counter = count()
+        self._counters.append(counter)
+        return map(_first, zip(iterable, counter))
+
+    def add_events(self, n):
+        """Count n events processed outside of wrap (e.g. in chunks)."""
+        self.metrics.events += n
+
+    def __enter__(self):
+        if self.recorder.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+        self._cpu_start = time.process_time()
+        self._wall_start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        metrics = self.metrics
+        metrics.wall_time = time.perf_counter() - self._wall_start
+        metrics.cpu_time = time.process_time() - self._cpu_start
+        metrics.events += sum(next(counter) for counter in self._counters)
+        if self.recorder.trace_memory:
+            metrics.peak_traced = tracemalloc.get_traced_memory()[1]
+            if self._started_tracing:
+                tracemalloc.stop()
+        metrics.peak_rss = peak_rss_bytes()
+        self.recorder.records.append(metrics)
+        return False
+
+
+class MetricsRecorder:
+    """Collect StageMetrics for the stages of a generator pipeline.
+
+    Memory is sampled as the process peak RSS at the end of each stage;
+    trace_memory=True also records the tracemalloc peak of each stage,
+    at the cost of slowing down every allocation.
+
+    Counting items through wrap costs a few tens of nanoseconds per
+    item. In sampling mode (sample_every=N) functions decorated with
+    instrument are only measured on one call out of N, and the other
+    calls return the bare generator, which keeps the average overhead
+    of hot, repeatedly called stages under a few percent.
+    """
+
+    def __init__(self, trace_memory=False, sample_every=1):
+        if sample_every < 1:
+            raise ValueError("sample_every must be >= 1")
+        self.trace_memory = trace_memory
+        self.sample_every = sample_every
+        self.records = []
+        self._calls = count()
+
+    def stage(self, name):
+        """Return a context manager measuring a named stage."""
+        return _Stage(self, name)
+
+    def instrument(self, name=None):
+        """Decorate a generator function so its runs are measured.
+
+        The decorated function yields exactly what the original yields;
+        the stage is recorded when the generator is exhausted or closed.
+        """
+        def decorator(func):
+            stage_name = name or func.__name__
+
+            def measured(gen):
+                with self.stage(stage_name) as stage:
+                    yield from stage.wrap(gen)
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                gen = func(*args, **kwargs)
+                if next(self._calls) % self.sample_every:
+                    return gen
+                return measured(gen)
+
+            return wrapper
+
+        return decorator
+
+    def report(self):
+        """Return human-readable report lines, one per stage."""
+        lines = []
+        for m in self.records:
+            line = (
+                f"{m.name}: {m.events} events in {m.wall_time:.3f}s "
+                f"(cpu {m.cpu_time:.3f}s, {m.events_per_sec:,.0f} events/s"
+            )
+            if m.peak_traced is not None:
+                line += f", peak traced {format_bytes(m.peak_traced)}"
+            if m.peak_rss is not None:
+                line += f", peak RSS {format_bytes(m.peak_rss)}"
+            lines.append(line + ")")
+        return lines
+
+    def to_json(self):
+        """Return every recorded stage as a JSON document."""
+        return json.dumps([m.as_dict() for m in self.records], indent=2)
+
+
+def format_bytes(size):
+    """Format a byte count with a binary unit suffix."""
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
@@ -5,16 +5,34 @@ ft_analytics_dashboard.py
 Exercise 6: Data Alchemist
 Demonstrate list/dict/set comprehensions on sample gaming data.
 Authorized: comprehensions, len(), print(), sum(), max(), min(), sorted()
+
+PlayerTable and table_metrics compute the same dashboard from columnar
+data in a single scan (run with --bench to compare at 10^6 players).
+DashboardState keeps them up to date from player events instead
+(run with --check to replay random events against a full recompute).
 """
 
+import heapq
+import random
+import sys
+import time
+from array import array
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 def format_set(values):
     """Return a stable, pretty set-like string with sorted elements."""
     return "{" + ", ".join([repr(v) for v in sorted(values)]) + "}"
 
 
-def main():
-    players = [
+def sample_players():
+    """Return the sample gaming data as a list of player dicts."""
+    return [
         {
             "name": "alice",
             "score": 2300,
@@ -68,6 +86,9 @@ def main():
         },
     ]
 
+
+def comprehension_metrics(players):
+    """Compute every dashboard metric with one comprehension each."""
     # === List Comprehension Examples ===
     high_scorers = [p["name"] for p in players if p["score"] > 2000]
     scores_doubled = [p["score"] * 2 for p in players]
@@ -94,42 +115,462 @@ def main():
     active_regions = {p["region"] for p in players if p["active"]}
 
     # === Combined Analysis ===
-    total_players = len(players)
-    total_unique_achievements = len(unique_achievements)
-    average_score = sum([p["score"] for p in players]) / len(players)
-
     top_player = max(players, key=lambda p: p["score"])
-    top_name = top_player["name"]
-    top_score = top_player["score"]
-    top_achievements = len(top_player["achievements"])
 
-    # === Output ===
+    return {
+        "high_scorers": high_scorers,
+        "scores_doubled": scores_doubled,
+        "active_players": active_players,
+        "player_scores": player_scores,
+        "score_categories": score_categories,
+        "achievement_counts": achievement_counts,
+        "unique_players": unique_players,
+        "unique_achievements": unique_achievements,
+        "active_regions": active_regions,
+        "total_players": len(players),
+        "total_score": sum([p["score"] for p in players]),
+        "top_name": top_player["name"],
+        "top_score": top_player["score"],
+        "top_achievements": len(top_player["achievements"]),
+    }
+
+
+class PlayerTable:
+    """Players stored column by column.
+
+    score is an array('q'), active an array('b') and region an
+    array('H') of codes into region_names. Achievements use a CSR
+    layout: the ids of player i are
+    achievement_ids[achievement_offsets[i]:achievement_offsets[i + 1]],
+    coded into achievement_names.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.score = array("q")
+        self.active = array("b")
+        self.region = array("H")
+        self.region_names = []
+        self.achievement_offsets = array("q", [0])
+        self.achievement_ids = array("l")
+        self.achievement_names = []
+        self._region_codes = {}
+        self._achievement_codes = {}
+
+    @classmethod
+    def from_players(cls, players):
+        """Build a table from a list of player dicts."""
+        table = cls()
+        for player in players:
+            table.append(player)
+        return table
+
+    def __len__(self):
+        return len(self.names)
+
+    def append(self, player):
+        """Append one player dict as a new row."""
+        self.names.append(player["name"])
+        self.score.append(player["score"])
+        self.active.append(1 if player["active"] else 0)
+        self.region.append(
+            _intern(player["region"], self._region_codes, self.region_names)
+        )
+        for achievement in player["achievements"]:
+            self.achievement_ids.append(_intern(
+                achievement, self._achievement_codes, self.achievement_names
+            ))
+        self.achievement_offsets.append(len(self.achievement_ids))
+
+
+def _intern(name, codes, names):
+    """Return the code of name in codes/names, adding it if new."""
+    code = codes.get(name)
+    if code is None:
+        code = len(names)
+        codes[name] = code
+        names.append(name)
+    return code
+
+
+def table_metrics(table):
+    """Compute every dashboard metric from a PlayerTable in one scan.
+
+    Uses NumPy when it is installed, a single Python loop otherwise;
+    both return exactly what comprehension_metrics returns.
+    """
+    if len(table) == 0:
+        raise ValueError("Dashboard needs at least one player")
+    if np is not None:
+        return _numpy_metrics(table)
+
+    names = table.names
+    offsets = table.achievement_offsets
+    high_scorers = []
+    scores_doubled = []
+    active_players = []
+    player_scores = {}
+    achievement_counts = {}
+    high = medium = low = 0
+    active_region_codes = set()
+    total_score = 0
+    top = 0
+    top_score = table.score[0]
+
+    for i, (name, score, active) in enumerate(
+        zip(names, table.score, table.active)
+    ):
+        total_score += score
+        scores_doubled.append(score * 2)
+        if score > 2000:
+            high_scorers.append(name)
+        if score >= 2100:
+            high += 1
+        elif score >= 1800:
+            medium += 1
+        else:
+            low += 1
+        if score > top_score:
+            top = i
+            top_score = score
+        if active:
+            active_players.append(name)
+            player_scores[name] = score
+            achievement_counts[name] = offsets[i + 1] - offsets[i]
+            active_region_codes.add(table.region[i])
+
+    return _finish_metrics(
+        table, high_scorers, scores_doubled, active_players, player_scores,
+        {"high": high, "medium": medium, "low": low}, achievement_counts,
+        set(table.achievement_ids), active_region_codes, total_score, top,
+    )
+
+
+def _numpy_metrics(table):
+    """Vectorized table_metrics."""
+    names = table.names
+    score = np.frombuffer(table.score, dtype=np.int64)
+    active = np.frombuffer(table.active, dtype=np.int8).astype(bool)
+    offsets = np.frombuffer(table.achievement_offsets, dtype=np.int64)
+    counts = np.diff(offsets)
+    active_rows = np.flatnonzero(active).tolist()
+    active_scores = score[active].tolist()
+    active_counts = counts[active].tolist()
+    active_names = [names[i] for i in active_rows]
+
+    high = int(np.count_nonzero(score >= 2100))
+    low = int(np.count_nonzero(score < 1800))
+    return _finish_metrics(
+        table,
+        [names[i] for i in np.flatnonzero(score > 2000).tolist()],
+        (score * 2).tolist(),
+        active_names,
+        dict(zip(active_names, active_scores)),
+        {"high": high, "medium": len(names) - high - low, "low": low},
+        dict(zip(active_names, active_counts)),
+        set(table.achievement_ids),
+        set(np.unique(
+            np.frombuffer(table.region, dtype=np.uint16)[active]
+        ).tolist()),
+        int(score.sum()),
+        int(np.argmax(score)),
+    )
+
+
+def _finish_metrics(table, high_scorers, scores_doubled, active_players,
+                    player_scores, score_categories, achievement_counts,
+                    achievement_codes, region_codes, total_score, top):
+    """Decode interned codes and assemble the metrics dict."""
+    offsets = table.achievement_offsets
+    return {
+        "high_scorers": high_scorers,
+        "scores_doubled": scores_doubled,
+        "active_players": active_players,
+        "player_scores": player_scores,
+        "score_categories": score_categories,
+        "achievement_counts": achievement_counts,
+        "unique_players": set(table.names),
+        "unique_achievements": {
+            table.achievement_names[code] for code in achievement_codes
+        },
+        "active_regions": {
+            table.region_names[code] for code in region_codes
+        },
+        "total_players": len(table),
+        "total_score": total_score,
+        "top_name": table.names[top],
+        "top_score": table.score[top],
+        "top_achievements": offsets[top + 1] - offsets[top],
+    }
+
+
+def score_category(score):
+    """Return the dashboard score category of a score."""
+    if score >= 2100:
+        return "high"
+    if score >= 1800:
+        return "medium"
+    return "low"
+
+
+class DashboardState:
+    """Dashboard metrics maintained incrementally from player events.
+
+    insert/update/delete adjust the score total, score-category
+    buckets, reference-counted achievement and active-region sets and
+    a top-performer heap with lazy deletion, in O(log n) per event.
+    Players keep their insertion position on update, so metrics()
+    returns exactly what comprehension_metrics returns for the list of
+    current players.
+    """
+
+    def __init__(self, players=()):
+        self._players = {}
+        self._seq = {}
+        self._next_seq = 0
+        self._total_score = 0
+        self._categories = {"high": 0, "medium": 0, "low": 0}
+        self._achievements = Counter()
+        self._active_regions = Counter()
+        self._heap = []
+        for player in players:
+            self.insert(player)
+
+    def __len__(self):
+        return len(self._players)
+
+    def insert(self, player):
+        """Add a new player dict; names must be unique."""
+        name = player["name"]
+        if name in self._players:
+            raise KeyError(f"Player {name} already exists")
+        self._seq[name] = self._next_seq
+        self._next_seq += 1
+        self._players[name] = dict(player)
+        self._add(self._players[name])
+
+    def update(self, player):
+        """Replace an existing player's data, keeping its position."""
+        name = player["name"]
+        self._remove(self._players[name])
+        self._players[name] = dict(player)
+        self._add(self._players[name])
+
+    def delete(self, name):
+        """Remove a player by name."""
+        self._remove(self._players.pop(name))
+        del self._seq[name]
+
+    def apply(self, event):
+        """Apply an ("insert" | "update", player) or ("delete", name)."""
+        kind, payload = event
+        if kind == "insert":
+            self.insert(payload)
+        elif kind == "update":
+            self.update(payload)
+        elif kind == "delete":
+            self.delete(payload)
+        else:
+            raise ValueError(f"Unknown dashboard event: {kind}")
+
+    def top_performer(self):
+        """Return the first player with the highest score."""
+        heap = self._heap
+        while heap:
+            score, seq, name = heap[0]
+            player = self._players.get(name)
+            if (
+                player is not None
+                and self._seq[name] == seq
+                and player["score"] == -score
+            ):
+                return player
+            heapq.heappop(heap)
+        raise ValueError("Dashboard needs at least one player")
+
+    def metrics(self):
+        """Return the dashboard metrics dict.
+
+        Aggregates come from the maintained state; only the per-player
+        lists and dicts of the report are walked.
+        """
+        top = self.top_performer()
+        players = self._players.values()
+        high_scorers = []
+        active_players = []
+        player_scores = {}
+        achievement_counts = {}
+        for p in players:
+            if p["score"] > 2000:
+                high_scorers.append(p["name"])
+            if p["active"]:
+                active_players.append(p["name"])
+                player_scores[p["name"]] = p["score"]
+                achievement_counts[p["name"]] = len(p["achievements"])
+        return {
+            "high_scorers": high_scorers,
+            "scores_doubled": [p["score"] * 2 for p in players],
+            "active_players": active_players,
+            "player_scores": player_scores,
+            "score_categories": dict(self._categories),
+            "achievement_counts": achievement_counts,
+            "unique_players": set(self._players),
+            "unique_achievements": set(self._achievements),
+            "active_regions": set(self._active_regions),
+            "total_players": len(self._players),
+            "total_score": self._total_score,
+            "top_name": top["name"],
+            "top_score": top["score"],
+            "top_achievements": len(top["achievements"]),
+        }
+
+    def _add(self, player):
+        self._total_score += player["score"]
+        self._categories[score_category(player["score"])] += 1
+        self._achievements.update(player["achievements"])
+        if player["active"]:
+            self._active_regions[player["region"]] += 1
+        name = player["name"]
+        heapq.heappush(self._heap, (-player["score"], self._seq[name], name))
+        if len(self._heap) > 2 * len(self._players) + 64:
+            self._heap = [
+                (-p["score"], self._seq[n], n)
+                for n, p in self._players.items()
+            ]
+            heapq.heapify(self._heap)
+
+    def _remove(self, player):
+        self._total_score -= player["score"]
+        self._categories[score_category(player["score"])] -= 1
+        self._achievements.subtract(player["achievements"])
+        for achievement in player["achievements"]:
+            if self._achievements[achievement] <= 0:
+                del self._achievements[achievement]
+        if player["active"]:
+            region = player["region"]
+            self._active_regions[region] -= 1
+            if self._active_regions[region] == 0:
+                del self._active_regions[region]
+
+
+def replay_check(events=5000, seed=0):
+    """Replay random insert/update/delete events against DashboardState.
+
+    After every event the incremental metrics are compared with a full
+    comprehension_metrics recompute. Returns the number of events
+    checked, or raises ValueError at the first mismatch.
+    """
+    rng = random.Random(seed)
+    pool = synthetic_players(200, seed)
+    state = DashboardState()
+    reference = {}
+    for step in range(events):
+        player = dict(rng.choice(pool))
+        player["score"] = rng.randint(1500, 2500)
+        player["active"] = rng.random() < 0.6
+        name = player["name"]
+        if name not in reference:
+            event = ("insert", player)
+            reference[name] = player
+        elif rng.random() < 0.4:
+            event = ("delete", name)
+            del reference[name]
+        else:
+            event = ("update", player)
+            reference[name] = player
+        state.apply(event)
+        if reference and state.metrics() != comprehension_metrics(
+            list(reference.values())
+        ):
+            raise ValueError(f"Dashboard mismatch after event {step}")
+    return events
+
+
+def print_dashboard(metrics):
+    """Print the dashboard report from a metrics dict."""
+    average_score = metrics["total_score"] / metrics["total_players"]
+
     print("=== Game Analytics Dashboard ===")
 
     print("=== List Comprehension Examples ===")
-    print(f"High scorers (>2000): {high_scorers}")
-    print(f"Scores doubled: {scores_doubled}")
-    print(f"Active players: {active_players}")
+    print(f"High scorers (>2000): {metrics['high_scorers']}")
+    print(f"Scores doubled: {metrics['scores_doubled']}")
+    print(f"Active players: {metrics['active_players']}")
 
     print("=== Dict Comprehension Examples ===")
-    print(f"Player scores: {player_scores}")
-    print(f"Score categories: {score_categories}")
-    print(f"Achievement counts: {achievement_counts}")
+    print(f"Player scores: {metrics['player_scores']}")
+    print(f"Score categories: {metrics['score_categories']}")
+    print(f"Achievement counts: {metrics['achievement_counts']}")
 
     print("=== Set Comprehension Examples ===")
-    print(f"Unique players: {format_set(unique_players)}")
-    print(f"Unique achievements: {format_set(unique_achievements)}")
-    print(f"Active regions: {format_set(active_regions)}")
+    print(f"Unique players: {format_set(metrics['unique_players'])}")
+    print(
+        "Unique achievements: "
+        f"{format_set(metrics['unique_achievements'])}"
+    )
+    print(f"Active regions: {format_set(metrics['active_regions'])}")
 
     print("=== Combined Analysis ===")
-    print(f"Total players: {total_players}")
-    print(f"Total unique achievements: {total_unique_achievements}")
+    print(f"Total players: {metrics['total_players']}")
+    print(
+        "Total unique achievements: "
+        f"{len(metrics['unique_achievements'])}"
+    )
     print(f"Average score: {average_score}")
     print(
-        f"Top performer: {top_name} "
-        f"({top_score} points, {top_achievements} achievements)"
+        f"Top performer: {metrics['top_name']} "
+        f"({metrics['top_score']} points, "
+        f"{metrics['top_achievements']} achievements)"
     )
 
 
+def synthetic_players(count, seed=42):
+    """Return count random player dicts shaped like sample_players()."""
+    rng = random.Random(seed)
+    regions = ("north", "east", "south", "west", "central")
+    achievements = [f"achievement_{i}" for i in range(200)]
+    return [
+        {
+            "name": f"player{i}",
+            "score": rng.randint(1000, 3000),
+            "active": rng.random() < 0.7,
+            "region": rng.choice(regions),
+            "achievements": rng.sample(achievements, rng.randint(0, 8)),
+        }
+        for i in range(count)
+    ]
+
+
+def benchmark_dashboard(count=10 ** 6):
+    """Time comprehension_metrics against table_metrics."""
+    print("=== Dashboard Benchmark ===")
+    players = synthetic_players(count)
+
+    start = time.perf_counter()
+    expected = comprehension_metrics(players)
+    print(f"comprehensions: {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    table = PlayerTable.from_players(players)
+    print(f"table build: {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    metrics = table_metrics(table)
+    engine = "numpy" if np is not None else "python"
+    print(f"single pass ({engine}): {time.perf_counter() - start:.3f}s")
+    print(f"identical metrics: {metrics == expected}")
+
+
+def main():
+    print_dashboard(table_metrics(PlayerTable.from_players(sample_players())))
+
+
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:] == ["--bench"]:
+        benchmark_dashboard()
+    elif sys.argv[1:] == ["--check"]:
+        checked = replay_check()
+        print(f"Incremental dashboard matched full recompute "
+              f"over {checked} events")
+    else:
+        main()
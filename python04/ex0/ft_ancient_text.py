@@ -1,19 +1,95 @@
 #!/usr/bin/env python3
 
-def main():
+import argparse
+import mmap
+import os
+import sys
+import time
+
+# Bytes read (and written) per chunk in streaming mode.
+CHUNK_SIZE = 1 << 20
+
+
+def recover_stream(file, out, chunk_size=CHUNK_SIZE, use_mmap=False,
+                   offset=0, length=None):
+    """Copy length bytes of a binary file from offset to out.
+
+    The fragment is never held in memory as a whole: it is read in
+    chunk_size pieces into one reused buffer, or sliced out of a
+    read-only memory map when use_mmap is set. Returns the number of
+    bytes copied.
+    """
+    if offset < 0 or (length is not None and length < 0):
+        raise ValueError("offset and length must be >= 0")
+    size = os.fstat(file.fileno()).st_size
+    offset = min(offset, size)
+    end = size if length is None else min(size, offset + length)
+    if end <= offset:
+        return 0
+    if use_mmap:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            for start in range(offset, end, chunk_size):
+                out.write(view[start:min(start + chunk_size, end)])
+        return end - offset
+
+    file.seek(offset)
+    chunk = memoryview(bytearray(chunk_size))
+    remaining = end - offset
+    while remaining:
+        count = file.readinto(chunk[:min(chunk_size, remaining)])
+        if not count:
+            break
+        out.write(chunk[:count])
+        remaining -= count
+    return end - offset - remaining
+
+
+def stream_recovery(path, chunk_size=CHUNK_SIZE, use_mmap=False,
+                    offset=0, length=None):
+    """Stream a fragment to stdout and report the throughput on stderr."""
     print("=== CYBER ARCHIVES - DATA RECOVERY SYSTEM ===\n")
-    print("Accessing Storage Vault: ancient_fragment.txt")
+    print(f"Accessing Storage Vault: {path}")
 
     try:
-        file = open("ancient_fragment.txt", "r")
+        file = open(path, "rb")
+    except FileNotFoundError:
+        print("ERROR: Storage vault not found. Run data generator first.")
+        return
+    except OSError as exc:
+        print(f"ERROR: Storage vault cannot be accessed: {exc}")
+        return
+
+    with file:
         print("Connection established...\n")
         print("RECOVERED DATA:")
+        sys.stdout.flush()
+        start = time.perf_counter()
+        with open(sys.stdout.fileno(), "wb", buffering=chunk_size,
+                  closefd=False) as out:
+            copied = recover_stream(file, out, chunk_size, use_mmap,
+                                    offset, length)
+        elapsed = time.perf_counter() - start
+        print("\n")
+
+    print("Data recovery complete. Storage unit disconnected.")
+    rate = copied / elapsed if elapsed > 0 else 0.0
+    print(f"Recovered {copied} bytes in {elapsed:.3f}s "
+          f"({rate / (1 << 20):.1f} MiB/s)", file=sys.stderr)
+
+
+def main():
+    print("=== CYBER ARCHIVES - DATA RECOVERY SYSTEM ===\n")
+    print("Accessing Storage Vault: ancient_fragment.txt")
+
+    try:
+        with open("ancient_fragment.txt", "r") as file:
+            print("Connection established...\n")
+            print("RECOVERED DATA:")
 
-        data = file.read()
-        print(data)
-        print()
+            data = file.read()
+            print(data)
+            print()
 
-        file.close()
         print("Data recovery complete. Storage unit disconnected.")
 
     except FileNotFoundError:
@@ -21,4 +97,39 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(
+        description="Recover an archive fragment to standard output."
+    )
+    parser.add_argument(
+        "--stream", metavar="PATH",
+        help="stream PATH chunk by chunk instead of reading it whole",
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=CHUNK_SIZE,
+        help=f"bytes per read/write in streaming mode "
+             f"(default: {CHUNK_SIZE})",
+    )
+    parser.add_argument(
+        "--mmap", action="store_true",
+        help="read the fragment through a memory map",
+    )
+    parser.add_argument(
+        "--offset", type=int, default=0,
+        help="first byte to recover in streaming mode (default: 0)",
+    )
+    parser.add_argument(
+        "--length", type=int,
+        help="bytes to recover in streaming mode (default: to the end)",
+    )
+    args = parser.parse_args()
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be positive")
+    if args.offset < 0:
+        parser.error("--offset must be >= 0")
+    if args.length is not None and args.length < 0:
+        parser.error("--length must be >= 0")
+    if args.stream:
+        stream_recovery(args.stream, args.chunk_size, args.mmap,
+                        args.offset, args.length)
+    else:
+        main()
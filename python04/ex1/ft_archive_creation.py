@@ -1,25 +1,148 @@
 #!/usr/bin/env python3
 
+import os
+import sys
+import tempfile
+import time
+from itertools import islice
+
+# Entries formatted and written per batch by ArchiveWriter.
+BATCH_ENTRIES = 1 << 14
+
+_format_entry = "{[}ENTRY %03d{]} %s\n".__mod__
+
+
+class ArchiveWriter:
+    """Write numbered "{[}ENTRY NNN{]} text" lines to an archive file.
+
+    Entries are formatted once per batch of batch_size, joined into a
+    single buffer and written with one call; the same buffer is
+    mirrored to stdout when mirror is set. With fsync_every=N the file
+    is flushed and fsynced after every N entries (and on close), so at
+    most N entries can be lost on a crash.
+    """
+
+    def __init__(self, path, batch_size=BATCH_ENTRIES, fsync_every=None,
+                 mirror=False, first=1):
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        if fsync_every is not None and fsync_every < 1:
+            raise ValueError("fsync_every must be >= 1")
+        self.batch_size = batch_size
+        self.fsync_every = fsync_every
+        self.mirror = mirror
+        self.written = 0
+        self._next = first
+        self._unsynced = 0
+        self._file = open(path, "wb", buffering=1 << 20)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def write_entries(self, entries):
+        """Append an iterable of entry texts; return how many were written."""
+        entries = iter(entries)
+        total = 0
+        while True:
+            size = self.batch_size
+            if self.fsync_every:
+                # End the batch on the next fsync boundary.
+                size = min(size, self.fsync_every - self._unsynced)
+            batch = list(islice(entries, size))
+            if not batch:
+                return total
+            numbers = range(self._next, self._next + len(batch))
+            self._next += len(batch)
+            text = "".join(map(_format_entry, zip(numbers, batch)))
+            self._file.write(text.encode())
+            if self.mirror:
+                sys.stdout.write(text)
+            total += len(batch)
+            self.written += len(batch)
+            self._unsynced += len(batch)
+            if self.fsync_every and self._unsynced >= self.fsync_every:
+                self.sync()
+
+    def sync(self):
+        """Flush buffered entries and fsync them to stable storage."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        """Flush, fsync when fsync_every is set, and close the file."""
+        if self._file.closed:
+            return
+        try:
+            if self.fsync_every and self._unsynced:
+                self.sync()
+        finally:
+            self._file.close()
+
+
+def write_per_line(path, entries):
+    """Write entries one file.write per line, as main used to."""
+    with open(path, "w") as file:
+        for number, entry in enumerate(entries, 1):
+            file.write(f"{{[}}ENTRY {number:03d}{{]}} {entry}\n")
+
+
+def benchmark(size=10 ** 6, fsync_every=10 ** 5):
+    """Compare entries/sec of per-line writes and ArchiveWriter."""
+    print("=== Archive Writer Benchmark ===")
+    entries = [f"Recovered fragment {i} of the archives"
+               for i in range(size)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "archive.txt")
+
+        def batched(fsync=None):
+            with ArchiveWriter(path, fsync_every=fsync) as writer:
+                writer.write_entries(entries)
+
+        results = {}
+        for label, run in (
+            ("per-line write", lambda: write_per_line(path, entries)),
+            ("ArchiveWriter", batched),
+            (f"ArchiveWriter, fsync every {fsync_every}",
+             lambda: batched(fsync_every)),
+        ):
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            with open(path, "rb") as file:
+                results[label] = file.read()
+            print(f"{label}: {size / elapsed:,.0f} entries/s")
+
+    if len(set(results.values())) != 1:
+        raise ValueError("Writers produced different archives")
+    print(f"All archives identical ({size} entries)")
+
+
 def main():
     print("=== CYBER ARCHIVES - PRESERVATION SYSTEM ===\n")
     print("Initializing new storage unit: new_discovery.txt")
 
-    file = open("classified_data.txt", "w")
-    print("Storage unit created successfully...\n")
-    print("Inscribing preservation data...")
-
-    file.write("{[}ENTRY 001{]} New quantum algorithm discovered\n")
-    file.write("{[}ENTRY 002{]} Efficiency increased by 347%\n")
-    file.write("{[}ENTRY 003{]} Archived by Data Archivist trainee\n")
-    print("{[}ENTRY 001{]} New quantum algorithm discovered")
-    print("{[}ENTRY 002{]} Efficiency increased by 347%")
-    print("{[}ENTRY 003{]} Archived by Data Archivist trainee\n")
+    with ArchiveWriter("classified_data.txt", mirror=True) as writer:
+        print("Storage unit created successfully...\n")
+        print("Inscribing preservation data...")
 
-    file.close()
+        writer.write_entries([
+            "New quantum algorithm discovered",
+            "Efficiency increased by 347%",
+            "Archived by Data Archivist trainee",
+        ])
+        print()
 
     print("Data inscription complete. Storage unit sealed.")
     print("Archive 'new_discovery.txt' ready for long-term preservation.")
 
 
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:] == ["--bench"]:
+        benchmark()
+    else:
+        main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import sys
+import time
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from ft_crisis_response import access_archive, report_access
+
+# Upper bound of the first latency bucket; each next bucket doubles it.
+FIRST_BUCKET = 0.0001
+
+# Width of the longest histogram bar.
+BAR_WIDTH = 40
+
+
+async def _timed_access(filename, semaphore, executor):
+    """Return (category, data, total latency, access latency).
+
+    The total latency includes the wait for a concurrency slot; the
+    access latency only covers the open/read done in the thread pool.
+    """
+    loop = asyncio.get_running_loop()
+    queued = time.perf_counter()
+    async with semaphore:
+        start = time.perf_counter()
+        category, data = await loop.run_in_executor(
+            executor, access_archive, filename
+        )
+        done = time.perf_counter()
+    return category, data, done - queued, done - start
+
+
+async def handle_crises(filenames, concurrency=16):
+    """Access filenames concurrently and report them in input order.
+
+    At most concurrency files are opened at once, in a thread pool of
+    that size; at most twice as many results are held waiting for an
+    earlier, slower file to be reported. Returns the (total, access)
+    latency lists and the wall time of the whole batch.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be >= 1")
+    semaphore = asyncio.Semaphore(concurrency)
+    pending = deque()
+    totals = []
+    accesses = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        names = iter(filenames)
+        while True:
+            for filename in names:
+                pending.append((filename, asyncio.ensure_future(
+                    _timed_access(filename, semaphore, executor)
+                )))
+                if len(pending) >= 2 * concurrency:
+                    break
+            if not pending:
+                break
+            filename, task = pending.popleft()
+            category, data, total, access = await task
+            report_access(filename, category, data)
+            totals.append(total)
+            accesses.append(access)
+    return totals, accesses, time.perf_counter() - start
+
+
+def latency_histogram(latencies):
+    """Return (upper bound in seconds, count) buckets doubling in size."""
+    if not latencies:
+        return []
+    bounds = [FIRST_BUCKET]
+    while bounds[-1] < max(latencies):
+        bounds.append(bounds[-1] * 2)
+    counts = [0] * len(bounds)
+    for latency in latencies:
+        counts[bisect_left(bounds, latency)] += 1
+    return list(zip(bounds, counts))
+
+
+def print_histogram(title, latencies):
+    """Print a latency histogram with one bar per bucket."""
+    print(f"{title} ({len(latencies)} files):")
+    histogram = latency_histogram(latencies)
+    peak = max((count for _, count in histogram), default=0)
+    for bound, count in histogram:
+        bar = "#" * (count * BAR_WIDTH // peak if peak else 0)
+        print(f"  <= {bound * 1000:9.3f} ms  {count:>7}  {bar}".rstrip())
+
+
+def main(filenames, concurrency=16):
+    print("=== CYBER ARCHIVES - ASYNC CRISIS RESPONSE SYSTEM ===")
+    print()
+
+    totals, accesses, elapsed = asyncio.run(
+        handle_crises(filenames, concurrency)
+    )
+
+    print("All crisis scenarios handled successfully. Archives secure.")
+    print()
+    print(f"Batch latency: {elapsed * 1000:.3f} ms for {len(totals)} "
+          f"archives (concurrency {concurrency})")
+    print_histogram("Per-file latency, queue wait included", totals)
+    print_histogram("Per-file access latency", accesses)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Handle archive access crises concurrently."
+    )
+    parser.add_argument(
+        "paths", nargs="*",
+        help="archives to access, in reporting order (default: the "
+             "crisis response demo archives)",
+    )
+    parser.add_argument(
+        "--list", metavar="FILE",
+        help="also access the paths listed in FILE, one per line "
+             "('-' for stdin)",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=16,
+        help="archives opened at the same time (default: 16)",
+    )
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be >= 1")
+    paths = list(args.paths)
+    if args.list:
+        if args.list == "-":
+            paths.extend(line.rstrip("\n") for line in sys.stdin)
+        else:
+            with open(args.list, "r") as listing:
+                paths.extend(line.rstrip("\n") for line in listing)
+        paths = [path for path in paths if path]
+    elif not paths:
+        paths = ["lost_archive.txt", "classified_vault.txt",
+                 "standard_archive.txt"]
+    main(paths, args.concurrency)
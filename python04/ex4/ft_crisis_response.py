@@ -1,40 +1,119 @@
 #!/usr/bin/env python3
 
-def crisis_handler(filename):
+import argparse
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+ROUTINE = "routine"
+NOT_FOUND = "not found"
+PERMISSION_DENIED = "permission denied"
+OTHER = "other"
+
+CATEGORIES = (ROUTINE, NOT_FOUND, PERMISSION_DENIED, OTHER)
+
+# Characters decoded per call when an audit checks a file is readable.
+AUDIT_CHUNK = 1 << 16
+
+
+def _access_once(filename, handle):
+    """Open filename for reading once and classify the attempt.
+
+    handle(file) runs on the open file; its result is returned as
+    (ROUTINE, result), any failure as (category, None).
+    """
     try:
-        with open(filename, "r"):
-            pass
-        is_routine = True
-    except (FileNotFoundError, PermissionError):
-        is_routine = False
+        with open(filename, "r") as file:
+            return ROUTINE, handle(file)
+    except FileNotFoundError:
+        return NOT_FOUND, None
+    except PermissionError:
+        return PERMISSION_DENIED, None
     except Exception:
-        is_routine = False
+        return OTHER, None
+
+
+def access_archive(filename):
+    """Open and read filename once; return (category, data or None)."""
+    return _access_once(filename, lambda file: file.read())
+
 
-    if is_routine:
+def report_access(filename, category, data):
+    """Print the ROUTINE/CRISIS report of one access attempt."""
+    if category == ROUTINE:
         print(f"ROUTINE ACCESS: Attempting access to '{filename}'...")
-        with open(filename, "r") as file:
-            data = file.read()
         print(f"SUCCESS: Archive recovered - ``{data}''")
         print("STATUS: Normal operations resumed")
     else:
         print(f"CRISIS ALERT: Attempting access to '{filename}'...")
-        try:
-            with open(filename, "r") as file:
-                _ = file.read()
-            print("STATUS: Normal operations resumed")
-        except FileNotFoundError:
+        if category == NOT_FOUND:
             print("RESPONSE: Archive not found in storage matrix")
             print("STATUS: Crisis handled, system stable")
-        except PermissionError:
+        elif category == PERMISSION_DENIED:
             print("RESPONSE: Security protocols deny access")
             print("STATUS: Crisis handled, security maintained")
-        except Exception:
+        else:
             print("RESPONSE: Unexpected system anomaly detected")
             print("STATUS: Crisis handled, system stable")
 
     print()
 
 
+def crisis_handler(filename):
+    report_access(filename, *access_archive(filename))
+
+
+def _decoded_size(file):
+    """Decode an open text file chunk by chunk; return its byte size."""
+    while file.read(AUDIT_CHUNK):
+        pass
+    return os.fstat(file.fileno()).st_size
+
+
+def audit_archive(filename):
+    """Open filename once, as access_archive does; return (category, size).
+
+    The file is classified exactly like crisis_handler would (an
+    undecodable archive is OTHER), decoding one chunk at a time; size
+    is the byte size from os.fstat, None unless the access is routine.
+    """
+    return _access_once(filename, _decoded_size)
+
+
+def audit_archives(filenames, workers=8):
+    """Audit filenames concurrently; return (filename, category, size).
+
+    Results come back in input order. File access releases the GIL,
+    so a thread pool overlaps the open/read latency of many paths.
+    """
+    filenames = list(filenames)
+    if workers <= 1:
+        results = map(audit_archive, filenames)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(audit_archive, filenames))
+    return [(filename, category, size)
+            for filename, (category, size) in zip(filenames, results)]
+
+
+def print_audit(results, summary_only=False):
+    """Print a status table of audit results and per-category counts."""
+    print("=== CYBER ARCHIVES - ARCHIVE AUDIT ===")
+    if not summary_only:
+        width = max([len(filename) for filename, _, _ in results] + [7])
+        print(f"{'ARCHIVE':<{width}}  {'STATUS':<17}  BYTES")
+        for filename, category, size in results:
+            size = "-" if size is None else size
+            print(f"{filename:<{width}}  {category.upper():<17}  {size}")
+        print()
+
+    counts = Counter(category for _, category, _ in results)
+    print(f"Archives audited: {len(results)}")
+    for category in CATEGORIES:
+        print(f"{category.capitalize()}: {counts[category]}")
+
+
 def main():
     print("=== CYBER ARCHIVES - CRISIS RESPONSE SYSTEM ===")
     print()
@@ -47,4 +126,36 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(
+        description="Handle archive access crises."
+    )
+    parser.add_argument(
+        "--audit", nargs="+", default=[], metavar="PATH",
+        help="audit the given archive paths instead of the demo",
+    )
+    parser.add_argument(
+        "--audit-list", metavar="FILE",
+        help="audit the paths listed in FILE, one per line ('-' for "
+             "stdin)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=8,
+        help="threads opening archives concurrently (default: 8)",
+    )
+    parser.add_argument(
+        "--summary-only", action="store_true",
+        help="print only the per-category counts of an audit",
+    )
+    args = parser.parse_args()
+    paths = list(args.audit)
+    if args.audit_list:
+        if args.audit_list == "-":
+            paths.extend(line.rstrip("\n") for line in sys.stdin)
+        else:
+            with open(args.audit_list, "r") as listing:
+                paths.extend(line.rstrip("\n") for line in listing)
+        paths = [path for path in paths if path]
+    if args.audit or args.audit_list:
+        print_audit(audit_archives(paths, args.workers), args.summary_only)
+    else:
+        main()